@@ -0,0 +1,183 @@
+import re
+
+from search import fold
+
+LINKED_TABLES = ("accounts", "meters", "requests")
+
+SKIPPED_WORDS = {"ул", "улица", "д", "дом"}
+ABBREVIATIONS = {
+    "проспект": "пр-т",
+    "просп": "пр-т",
+    "пр": "пр-т",
+    "переулок": "пер",
+    "бульвар": "б-р",
+    "бул": "б-р",
+    "шоссе": "ш",
+    "площадь": "пл",
+    "набережная": "наб",
+    "проезд": "пр-д",
+    "корпус": "к",
+    "корп": "к",
+    "строение": "с",
+    "стр": "с",
+    "квартира": "кв",
+}
+BUILDING_PART = re.compile(r"[кс]\d+\w*")
+GLUED_PREFIX = re.compile(r"(д|дом|кв|квартира)(\d[0-9a-zа-я/]*)")
+HOUSE_APARTMENT = re.compile(r"(\d[0-9a-zа-я/]*)-(\d[0-9a-zа-я]*)")
+APARTMENT_TAIL = re.compile(
+    r"(?:[\s,]*(?:кв|квартира)(?![а-я])\.?\s*\S+|(?<=\d)-\d\w*|(?<=\d)[\s,]+\d\w*)\s*$",
+    re.IGNORECASE
+)
+
+
+def _starts_with_digit(token):
+    return token[:1].isdigit()
+
+
+def _split_tokens(address):
+    tokens = []
+    for token in re.findall(r"[0-9a-zа-я/-]+", fold(address).lower()):
+        glued = GLUED_PREFIX.fullmatch(token)
+        house_apartment = HOUSE_APARTMENT.fullmatch(token)
+        if glued:
+            tokens += glued.groups()
+        elif house_apartment:
+            tokens += [house_apartment.group(1), "кв", house_apartment.group(2)]
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def normalize(address):
+    tokens = _split_tokens(address)
+    parts = []
+    apartment = ""
+    i = 0
+    while i < len(tokens):
+        token = ABBREVIATIONS.get(tokens[i], tokens[i])
+        following = tokens[i + 1] if i + 1 < len(tokens) else ""
+        house = parts and _starts_with_digit(parts[-1])
+
+        if token in ("д", "дом") and _starts_with_digit(following):
+            parts.append(following)
+            i += 1
+        elif token in SKIPPED_WORDS:
+            pass
+        elif token in ("к", "с") and house and _starts_with_digit(following):
+            parts[-1] += token + following
+            i += 1
+        elif BUILDING_PART.fullmatch(token) and house:
+            parts[-1] += token
+        elif token == "кв":
+            apartment = following
+            i += 1
+        elif _starts_with_digit(token) and house:
+            apartment = apartment or token
+        else:
+            parts.append(token)
+        i += 1
+
+    return " ".join(parts), apartment
+
+
+def address_key(building, apartment):
+    return f"{building} кв {apartment}" if apartment else building
+
+
+def building_display(address, apartment):
+    address = address.strip()
+    if apartment:
+        address = APARTMENT_TAIL.sub("", address).rstrip(" ,")
+    return address
+
+
+def resolve(connection, address):
+    building, apartment = normalize(address)
+    key = address_key(building, apartment)
+    row = connection.execute("SELECT id FROM addresses WHERE key = ?", (key,)).fetchone()
+    if row:
+        return row[0]
+
+    connection.execute(
+        "INSERT OR IGNORE INTO buildings (key, display) VALUES (?, ?)",
+        (building, building_display(address, apartment))
+    )
+    building_id = connection.execute("SELECT id FROM buildings WHERE key = ?", (building,)).fetchone()[0]
+    return connection.execute(
+        "INSERT INTO addresses (key, building_id, apartment, display) VALUES (?, ?, ?, ?)",
+        (key, building_id, apartment, address.strip())
+    ).lastrowid
+
+
+def account_for_address(connection, address_id):
+    row = connection.execute(
+        "SELECT id FROM accounts WHERE address_id = ? ORDER BY id LIMIT 1", (address_id,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def relink_addresses(cursor):
+    keys = dict(cursor.execute("SELECT id, key FROM addresses").fetchall())
+    for table in LINKED_TABLES:
+        for raw, address_id in cursor.execute(
+            f"SELECT DISTINCT address, address_id FROM {table} WHERE address_id IS NOT NULL"
+        ).fetchall():
+            key = address_key(*normalize(raw))
+            if keys.get(address_id) == key:
+                continue
+            new_id = resolve(cursor, raw)
+            keys[new_id] = key
+            cursor.execute(
+                f"UPDATE {table} SET address_id = ? WHERE address = ? AND address_id = ?", (new_id, raw, address_id)
+            )
+
+    linked = " UNION ".join(f"SELECT address_id FROM {table} WHERE address_id IS NOT NULL" for table in LINKED_TABLES)
+    cursor.execute(f"DELETE FROM addresses WHERE id NOT IN ({linked})")
+    cursor.execute("DELETE FROM buildings WHERE id NOT IN (SELECT building_id FROM addresses)")
+    cursor.execute('''
+    UPDATE requests SET account_id = (
+        SELECT MIN(a.id) FROM accounts a WHERE a.address_id = requests.address_id
+    )
+    WHERE address_id IS NOT NULL
+      AND account_id IS NOT NULL
+      AND (SELECT a.address_id FROM accounts a WHERE a.id = requests.account_id) IS NOT requests.address_id
+    ''')
+
+    for building_id, display, apartment in cursor.execute('''
+        SELECT b.id, a.display, a.apartment
+        FROM buildings b
+        JOIN addresses a ON a.id = (SELECT MIN(id) FROM addresses WHERE building_id = b.id)
+    ''').fetchall():
+        cursor.execute(
+            "UPDATE buildings SET display = ? WHERE id = ?", (building_display(display, apartment), building_id)
+        )
+
+
+def link_addresses(cursor):
+    raw_addresses = set()
+    for table in LINKED_TABLES:
+        raw_addresses.update(
+            row[0] for row in cursor.execute(f"SELECT DISTINCT address FROM {table} WHERE address_id IS NULL")
+        )
+
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS raw_addresses (raw TEXT PRIMARY KEY, address_id INTEGER)")
+    cursor.execute("DELETE FROM temp.raw_addresses")
+    cursor.executemany(
+        "INSERT INTO temp.raw_addresses (raw, address_id) VALUES (?, ?)",
+        [(raw, resolve(cursor, raw)) for raw in raw_addresses]
+    )
+    for table in LINKED_TABLES:
+        cursor.execute(
+            f"UPDATE {table} SET address_id = "
+            f"(SELECT address_id FROM temp.raw_addresses WHERE raw = {table}.address) "
+            f"WHERE address_id IS NULL"
+        )
+    cursor.execute("DROP TABLE temp.raw_addresses")
+
+    cursor.execute('''
+    UPDATE requests SET account_id = (
+        SELECT MIN(a.id) FROM accounts a WHERE a.address_id = requests.address_id
+    )
+    WHERE account_id IS NULL AND address_id IS NOT NULL
+    ''')
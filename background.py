@@ -0,0 +1,121 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from db import ConnectionPool
+from profiler import PROFILER
+
+POLL_INTERVAL_MS = 50
+WORKER_COUNT = 4
+
+
+class Job:
+    def __init__(self, description, results, on_done, on_error, on_progress, on_cancel, action=None):
+        self.description = description
+        self.action = action or description or "Фоновая задача"
+        self.cancel_event = threading.Event()
+        self.connection = None
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.on_cancel = on_cancel
+        self._results = results
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        self.cancel_event.set()
+        connection = self.connection
+        if connection is not None:
+            connection.interrupt()
+
+    def report_progress(self, value):
+        self._results.put((self, "progress", value))
+
+
+class BackgroundExecutor:
+    def __init__(self, root, db_path, workers=WORKER_COUNT, on_error=None, on_busy=None):
+        self.root = root
+        self.db_path = db_path
+        self.on_error = on_error
+        self.on_busy = on_busy
+
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="housing-worker")
+        self._connections = ConnectionPool(db_path, size=workers)
+        self._results = queue.Queue()
+        self._jobs = []
+        self._after_id = self.root.after(POLL_INTERVAL_MS, self._poll)
+
+    def submit(self, task, on_done=None, on_error=None, on_progress=None, on_cancel=None, description="", action=None):
+        job = Job(description, self._results, on_done, on_error or self.on_error, on_progress, on_cancel, action)
+        self._jobs.append(job)
+        self._notify_busy()
+        self._pool.submit(self._run, job, task)
+        return job
+
+    def _run(self, job, task):
+        if job.cancelled:
+            self._results.put((job, "cancelled", None))
+            return
+
+        with self._connections.connection() as connection:
+            job.connection = connection
+            try:
+                with PROFILER.action(job.action):
+                    result = task(connection, job)
+                kind = "cancelled" if job.cancelled else "done"
+            except Exception as e:
+                result = e
+                kind = "cancelled" if job.cancelled else "error"
+            finally:
+                job.connection = None
+
+        self._results.put((job, kind, result))
+
+    def _poll(self):
+        self._after_id = self.root.after(POLL_INTERVAL_MS, self._poll)
+
+        finished = False
+        while True:
+            try:
+                job, kind, payload = self._results.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "progress":
+                if job.on_progress and not job.cancelled:
+                    job.on_progress(payload)
+                continue
+
+            finished = True
+            if job in self._jobs:
+                self._jobs.remove(job)
+            if kind == "done" and job.on_done:
+                job.on_done(payload)
+            elif kind == "error" and job.on_error:
+                job.on_error(job, payload)
+            elif kind == "cancelled" and job.on_cancel:
+                job.on_cancel()
+
+        if finished:
+            self._notify_busy()
+
+    def _notify_busy(self):
+        if self.on_busy:
+            self.on_busy([job.description for job in self._jobs if job.description])
+
+    @property
+    def busy(self):
+        return bool(self._jobs)
+
+    def cancel_all(self):
+        for job in list(self._jobs):
+            job.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        self.root.after_cancel(self._after_id)
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._connections.interrupt_all()
@@ -0,0 +1,245 @@
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime
+
+import db
+import readings_archive
+
+PAGES_PER_STEP = 1024
+STEP_SLEEP = 0.005
+MAX_RESTARTS = 3
+KEEP_SNAPSHOTS = 7
+SNAPSHOT_SUFFIX = ".db.gz"
+ARCHIVE_SUFFIX = "-archive.db.gz"
+TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S-%f"
+TIMESTAMP_PATTERN = r"\d{8}-\d{6}(?:-\d{6})?"
+
+
+class BackupCancelled(Exception):
+    pass
+
+
+class _Restarted(Exception):
+    pass
+
+
+class SnapshotResult:
+    def __init__(self, path, files, size, timings, restarts):
+        self.path = path
+        self.files = files
+        self.size = size
+        self.timings = timings
+        self.restarts = restarts
+
+    @property
+    def elapsed(self):
+        return sum(self.timings.values())
+
+
+class VerifyResult:
+    def __init__(self, path, ok, messages, user_version, timings):
+        self.path = path
+        self.ok = ok
+        self.messages = messages
+        self.user_version = user_version
+        self.timings = timings
+
+    @property
+    def elapsed(self):
+        return sum(self.timings.values())
+
+
+def default_directory(db_path):
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), "backups")
+
+
+def snapshot_prefix(db_path):
+    return os.path.splitext(os.path.basename(db_path))[0]
+
+
+def list_snapshots(directory, prefix):
+    if not os.path.isdir(directory):
+        return []
+    pattern = re.compile(f"{re.escape(prefix)}-{TIMESTAMP_PATTERN}{re.escape(SNAPSHOT_SUFFIX)}")
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if pattern.fullmatch(name))
+
+
+def _new_snapshot_path(directory, prefix):
+    while True:
+        path = os.path.join(directory, f"{prefix}-{datetime.now().strftime(TIMESTAMP_FORMAT)}{SNAPSHOT_SUFFIX}")
+        if not any(os.path.exists(file) for file in (path, path + ".part", archive_sibling(path))):
+            return path
+
+
+def archive_sibling(snapshot_path):
+    return snapshot_path[:-len(SNAPSHOT_SUFFIX)] + ARCHIVE_SUFFIX
+
+
+def _copy(source, target, name, progress, cancel_event):
+    restarts = 0
+    remaining_before = None
+
+    def on_step(status, remaining, total):
+        nonlocal remaining_before, restarts
+        if cancel_event is not None and cancel_event.is_set():
+            raise BackupCancelled()
+        if remaining_before is not None and remaining > remaining_before:
+            restarts += 1
+            if restarts > MAX_RESTARTS:
+                raise _Restarted()
+        remaining_before = remaining
+        if progress:
+            progress(total - remaining, total)
+
+    try:
+        source.backup(target, pages=PAGES_PER_STEP, progress=on_step, name=name, sleep=STEP_SLEEP)
+    except _Restarted:
+        source.backup(target, pages=-1, name=name)
+    return restarts
+
+
+def _compress(path, target):
+    with open(path, "rb") as f, gzip.open(target, "wb", compresslevel=6) as out:
+        shutil.copyfileobj(f, out, 1024 * 1024)
+
+
+def _decompress(path, target):
+    with gzip.open(path, "rb") as f, open(target, "wb") as out:
+        shutil.copyfileobj(f, out, 1024 * 1024)
+
+
+def _check(path):
+    connection = sqlite3.connect(path)
+    try:
+        messages = [row[0] for row in connection.execute("PRAGMA integrity_check")]
+        user_version = connection.execute("PRAGMA user_version").fetchone()[0]
+    finally:
+        connection.close()
+    return messages == ["ok"], messages, user_version
+
+
+def rotate(directory, prefix, keep=KEEP_SNAPSHOTS):
+    removed = []
+    snapshots = list_snapshots(directory, prefix)
+    for path in snapshots[:max(len(snapshots) - keep, 0)]:
+        for file in (path, archive_sibling(path)):
+            if os.path.exists(file):
+                os.remove(file)
+                removed.append(file)
+    return removed
+
+
+def create_snapshot(db_path, directory=None, keep=KEEP_SNAPSHOTS, progress=None, cancel_event=None):
+    directory = directory or default_directory(db_path)
+    os.makedirs(directory, exist_ok=True)
+    prefix = snapshot_prefix(db_path)
+    path = _new_snapshot_path(directory, prefix)
+
+    timings = {"copy": 0.0, "verify": 0.0, "compress": 0.0}
+    restarts = 0
+    files = []
+    written = []
+    work_dir = tempfile.mkdtemp(prefix="zhkh-backup-", dir=directory)
+    source = db.connect(db_path, readonly=True)
+    try:
+        parts = [("main", path)]
+        if any(row[1] == readings_archive.ARCHIVE_SCHEMA for row in source.execute("PRAGMA database_list")):
+            parts.append((readings_archive.ARCHIVE_SCHEMA, archive_sibling(path)))
+
+        for schema_name, final_path in parts:
+            copy_path = os.path.join(work_dir, f"{schema_name}.db")
+            target = sqlite3.connect(copy_path)
+            try:
+                start = time.perf_counter()
+                restarts += _copy(source, target, schema_name, progress, cancel_event)
+                timings["copy"] += time.perf_counter() - start
+            finally:
+                target.close()
+
+            start = time.perf_counter()
+            ok, messages, _ = _check(copy_path)
+            timings["verify"] += time.perf_counter() - start
+            if not ok:
+                raise RuntimeError(f"Копия не прошла проверку целостности: {'; '.join(messages[:5])}")
+
+            start = time.perf_counter()
+            written.append(final_path + ".part")
+            _compress(copy_path, final_path + ".part")
+            timings["compress"] += time.perf_counter() - start
+            files.append(final_path)
+    except BaseException:
+        for part in written:
+            if os.path.exists(part):
+                os.remove(part)
+        raise
+    finally:
+        source.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    for final_path in files:
+        os.replace(final_path + ".part", final_path)
+    rotate(directory, prefix, keep)
+    size = sum(os.path.getsize(file) for file in files)
+    return SnapshotResult(path, files, size, timings, restarts)
+
+
+def verify_snapshot(snapshot_path):
+    timings = {"decompress": 0.0, "verify": 0.0}
+    work_dir = tempfile.mkdtemp(prefix="zhkh-verify-")
+    try:
+        copy_path = os.path.join(work_dir, "snapshot.db")
+        start = time.perf_counter()
+        _decompress(snapshot_path, copy_path)
+        timings["decompress"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ok, messages, user_version = _check(copy_path)
+        timings["verify"] = time.perf_counter() - start
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return VerifyResult(snapshot_path, ok, messages, user_version, timings)
+
+
+def _restore_file(snapshot_path, target_path, timings):
+    work_dir = tempfile.mkdtemp(prefix="zhkh-restore-", dir=os.path.dirname(os.path.abspath(target_path)))
+    try:
+        copy_path = os.path.join(work_dir, "snapshot.db")
+        start = time.perf_counter()
+        _decompress(snapshot_path, copy_path)
+        timings["decompress"] += time.perf_counter() - start
+
+        start = time.perf_counter()
+        ok, messages, _ = _check(copy_path)
+        timings["verify"] += time.perf_counter() - start
+        if not ok:
+            raise RuntimeError(f"Копия повреждена: {'; '.join(messages[:5])}")
+
+        source = sqlite3.connect(copy_path)
+        target = sqlite3.connect(target_path, timeout=db.BUSY_TIMEOUT_MS / 1000)
+        try:
+            start = time.perf_counter()
+            source.backup(target)
+            timings["restore"] += time.perf_counter() - start
+        finally:
+            target.close()
+            source.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def restore_snapshot(snapshot_path, db_path):
+    timings = {"decompress": 0.0, "verify": 0.0, "restore": 0.0, "check": 0.0}
+    _restore_file(snapshot_path, db_path, timings)
+    archive = archive_sibling(snapshot_path)
+    if os.path.exists(archive):
+        _restore_file(archive, readings_archive.archive_path(db_path), timings)
+
+    start = time.perf_counter()
+    ok, messages, user_version = _check(db_path)
+    timings["check"] = time.perf_counter() - start
+    return VerifyResult(db_path, ok, messages, user_version, timings)
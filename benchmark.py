@@ -0,0 +1,230 @@
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import billing
+import consumption
+import db
+import dispatch
+import paging
+import reports
+import search
+import storage
+
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.2
+RECEIPT_BATCH = 20
+INSERT_BATCH = 100
+COUNTED_TABLES = ("accounts", "meters", "meter_readings", "requests", "contractors", "ledger")
+
+
+class Case:
+    def __init__(self, name, run, repeat=None, setup=None):
+        self.name = name
+        self.run = run
+        self.repeat = repeat
+        self.setup = setup
+
+
+def _timed(case, repeat):
+    timings = []
+    for _ in range(case.repeat or repeat):
+        args = (case.setup(),) if case.setup else ()
+        start = time.perf_counter()
+        case.run(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "name": case.name,
+        "runs": len(timings),
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+def copy_database(source, target):
+    source_connection = sqlite3.connect(source)
+    target_connection = sqlite3.connect(target)
+    try:
+        source_connection.backup(target_connection)
+    finally:
+        target_connection.close()
+        source_connection.close()
+
+
+def _page_cases(connection, name, spec, sort_column, filter_text, search_text):
+    def first_page(**state):
+        def run():
+            query = paging.PageQuery(**spec)
+            for attribute, value in state.items():
+                setattr(query, attribute, value)
+            query.fetch_page(connection)
+        return run
+
+    def deep_page():
+        query = paging.PageQuery(**spec)
+        query.toggle_sort(sort_column)
+        for _ in range(10):
+            if not query.fetch_page(connection):
+                break
+
+    cases = [
+        Case(f"page.{name}.first", first_page()),
+        Case(f"page.{name}.sorted", first_page(sort_column=sort_column, descending=True)),
+        Case(f"page.{name}.filtered", first_page(filter_text=filter_text)),
+        Case(f"page.{name}.sorted_deep", deep_page),
+    ]
+    if spec.get("search_table"):
+        cases.append(Case(f"page.{name}.search", first_page(search_text=search_text)))
+    return cases
+
+
+def _sample(connection, query):
+    row = connection.execute(query).fetchone()
+    return row[0] if row else None
+
+
+def build_cases(connection, db_path, work_dir):
+    meter_id = _sample(connection, "SELECT meter_id FROM meter_readings GROUP BY meter_id ORDER BY COUNT(*) DESC LIMIT 1")
+    account_id = _sample(connection, "SELECT id FROM accounts ORDER BY id LIMIT 1")
+    address = _sample(connection, "SELECT address FROM accounts ORDER BY id LIMIT 1")
+    period = billing.current_period()
+
+    cases = []
+    cases += _page_cases(connection, "accounts", paging.ACCOUNTS, "balance", "Лен", search.match_expression("иванов"))
+    cases += _page_cases(connection, "requests", paging.REQUESTS, "date", "лифт", search.match_expression("протечка"))
+    cases += _page_cases(connection, "meters", paging.METERS, "last_reading", "Газ", "")
+
+    for name in reports.REPORTS:
+        cases.append(Case(f"report.{name}", lambda name=name: reports.build_report(connection, name), repeat=3))
+
+    cases.append(Case("consumption.analyze", lambda: consumption.analyze(connection), repeat=3))
+    cases.append(Case("billing.run", lambda: billing.run_billing(connection, period), repeat=3))
+
+    problems = [row[0] for row in connection.execute("SELECT problem FROM requests LIMIT 10000")]
+    problems += [problem for problem, _ in dispatch.CLASSIFY_EXAMPLES]
+    cases.append(Case(f"dispatch.classify_x{len(problems)}", lambda: [dispatch.classify(problem) for problem in problems]))
+
+    if meter_id is not None:
+        import charts
+
+        cases.append(Case(
+            "charts.figure_cold",
+            lambda cache: charts.consumption_figure(connection, meter_id, cache),
+            setup=charts.SeriesCache
+        ))
+        warm_cache = charts.SeriesCache()
+        cases.append(Case("charts.figure_cached", lambda: charts.consumption_figure(connection, meter_id, warm_cache)))
+
+    if account_id is not None:
+        import receipts
+
+        billing.ensure_period_billed(connection, period)
+        account = receipts._load_accounts(connection, [account_id])[0]
+        charges = billing.load_charges(connection, account_id, period)
+        cases.append(Case("receipts.single", lambda: receipts.build_receipt(account, charges, period)[0].output()))
+        batch_ids = [row[0] for row in connection.execute("SELECT id FROM accounts ORDER BY id LIMIT ?", (RECEIPT_BATCH,))]
+        cases.append(Case(
+            f"receipts.merged_{len(batch_ids)}",
+            lambda: receipts.generate_receipts_batch(
+                db_path, batch_ids, os.path.join(work_dir, "receipts"), period=period, merged=True
+            ),
+            repeat=3
+        ))
+
+    if address is not None:
+        cases.append(Case(
+            f"insert.request_x{INSERT_BATCH}",
+            lambda: [storage.add_request(connection, address, "Протечка в ванной", "Бенчмарк") for _ in range(INSERT_BATCH)]
+        ))
+        cases.append(Case(
+            f"insert.payment_x{INSERT_BATCH}",
+            lambda: [storage.post_payment(connection, account_id, "100.00") for _ in range(INSERT_BATCH)]
+        ))
+    if meter_id is not None:
+        today = storage.today_iso()
+        cases.append(Case(
+            f"insert.reading_x{INSERT_BATCH}",
+            lambda: [storage.save_meter_reading(connection, meter_id, today, 1_000_000.0 + i) for i in range(INSERT_BATCH)]
+        ))
+
+    cases.append(Case("startup.import_gui", _import_gui, repeat=3))
+    return cases
+
+
+def _import_gui():
+    subprocess.run(
+        [sys.executable, "-c", "import gui"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        check=True
+    )
+
+
+def metadata(connection, db_path):
+    return {
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "database": os.path.abspath(db_path),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "classifier_mismatches": len(dispatch.check_classifier()),
+        "rows": {
+            table: connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in COUNTED_TABLES
+        },
+    }
+
+
+def run(db_path, repeat=DEFAULT_REPEAT, only=None, progress=None):
+    work_dir = tempfile.mkdtemp(prefix="zhkh-bench-")
+    work_db = os.path.join(work_dir, "bench.db")
+    try:
+        copy_database(db_path, work_db)
+        connection = db.connect(work_db)
+        try:
+            info = metadata(connection, db_path)
+            results = []
+            for case in build_cases(connection, work_db, work_dir):
+                if only and not any(case.name.startswith(prefix) for prefix in only):
+                    continue
+                if progress:
+                    progress(case.name)
+                results.append(_timed(case, repeat))
+        finally:
+            connection.close()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {"metadata": info, "results": results}
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    previous = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get(result["name"])
+        if before is None or before["median_ms"] <= 0:
+            continue
+        ratio = result["median_ms"] / before["median_ms"]
+        result["baseline_median_ms"] = before["median_ms"]
+        result["ratio"] = round(ratio, 3)
+        if ratio > 1 + threshold:
+            regressions.append((result["name"], before["median_ms"], result["median_ms"], ratio))
+    return regressions
+
+
+def load(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save(results, path):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,241 @@
+from datetime import date
+
+from payments import KIND_ACCRUAL, KIND_ADJUSTMENT, SOURCE_BILLING
+
+SUBSIDY_RATE = 0.3
+LOOKUP_CHUNK = 500
+
+DEFAULT_SERVICES = (
+    ("cold_water", 1, "Холодная вода", "Cold water", "Холодная вода", 5.2),
+    ("hot_water", 2, "Горячая вода", "Hot water", "Горячая вода", 3.8),
+    ("electricity", 3, "Электричество", "Electricity", "Электричество", 120),
+    ("heating", 4, "Отопление", "Heating", "Отопление", 45.3),
+)
+
+DEFAULT_TARIFFS = (
+    ("cold_water", "2000-01-01", 35.78),
+    ("hot_water", "2000-01-01", 150.25),
+    ("electricity", "2000-01-01", 4.25),
+    ("heating", "2000-01-01", 25.60),
+)
+
+CHARGE_COLUMNS = "s.name_ru, s.name_en, c.rate, c.volume, c.amount, c.subsidy"
+
+REVERSE_ACCRUALS = f"""
+INSERT INTO ledger (account_id, date, period, kind, amount, source)
+SELECT l.account_id, :start, :period, '{KIND_ADJUSTMENT}', -SUM(l.amount), '{SOURCE_BILLING}'
+FROM ledger l
+WHERE l.period = :period AND l.source = '{SOURCE_BILLING}' AND l.account_id IN ({{accounts}})
+GROUP BY l.account_id
+HAVING SUM(l.amount) != 0
+"""
+
+POST_ACCRUALS = f"""
+INSERT INTO ledger (account_id, date, period, kind, amount, source)
+SELECT
+    c.account_id,
+    c.period || '-01',
+    c.period,
+    '{KIND_ACCRUAL}',
+    SUM(CAST(ROUND(c.amount * 100) AS INTEGER) - CAST(ROUND(c.subsidy * 100) AS INTEGER)),
+    '{SOURCE_BILLING}'
+FROM charges c
+WHERE {{condition}}
+GROUP BY c.account_id, c.period
+"""
+
+
+def current_period():
+    return date.today().strftime("%Y-%m")
+
+
+def period_bounds(period):
+    year, month = (int(part) for part in period.split("-"))
+    start = date(year, month, 1)
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start.isoformat(), end.isoformat()
+
+
+def format_period(period):
+    year, month = period.split("-")
+    return f"{month}.{year}"
+
+
+def seed_tariffs(cursor):
+    cursor.executemany(
+        """
+        INSERT OR IGNORE INTO services (code, sort_order, name_ru, name_en, meter_type, norm_volume)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        DEFAULT_SERVICES
+    )
+    cursor.executemany(
+        "INSERT OR IGNORE INTO tariffs (service, valid_from, rate) VALUES (?, ?, ?)",
+        DEFAULT_TARIFFS
+    )
+
+
+def create_accruals(cursor):
+    cursor.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_ledger_billing ON ledger (period, account_id) WHERE source = '{SOURCE_BILLING}'"
+    )
+    cursor.execute(POST_ACCRUALS.format(condition="c.account_id IN (SELECT id FROM accounts)"))
+
+
+def run_billing(connection, period, account_ids=None):
+    start, end = period_bounds(period)
+    params = {"start": start, "end": end, "period": period, "subsidy_rate": SUBSIDY_RATE}
+
+    account_filter = ""
+    if account_ids is not None:
+        names = [f"account_{i}" for i in range(len(account_ids))]
+        account_filter = "AND a.id IN (" + ", ".join(f":{name}" for name in names) + ")"
+        params.update(zip(names, account_ids))
+
+    billed_accounts = f"SELECT a.id FROM accounts a WHERE 1 {account_filter}"
+    with connection:
+        connection.execute(REVERSE_ACCRUALS.format(accounts=billed_accounts), params)
+        connection.execute(
+            f"DELETE FROM charges WHERE period = :period AND account_id IN (SELECT a.id FROM accounts a WHERE 1 {account_filter})",
+            params
+        )
+        cursor = connection.execute(
+            f"""
+            INSERT INTO charges (account_id, period, service, rate, volume, amount, subsidy)
+            WITH billed_accounts AS (
+                SELECT a.id, a.address_id, a.subsidy FROM accounts a WHERE 1 {account_filter}
+            ),
+            meter_bounds AS (
+                SELECT
+                    m.address_id,
+                    m.type,
+                    (
+                        SELECT mm.last_value FROM meter_monthly mm
+                        WHERE mm.meter_id = m.id AND mm.month = :period
+                    ) AS end_value,
+                    COALESCE(
+                        (
+                            SELECT mm.last_value FROM meter_monthly mm
+                            WHERE mm.meter_id = m.id AND mm.month < :period
+                            ORDER BY mm.month DESC LIMIT 1
+                        ),
+                        (
+                            SELECT mm.first_value FROM meter_monthly mm
+                            WHERE mm.meter_id = m.id AND mm.month = :period
+                        )
+                    ) AS start_value
+                FROM meters m
+                WHERE m.address_id IN (SELECT address_id FROM billed_accounts)
+            ),
+            metered AS (
+                SELECT address_id, type, SUM(MAX(end_value - start_value, 0)) AS volume
+                FROM meter_bounds
+                WHERE end_value IS NOT NULL
+                GROUP BY address_id, type
+            ),
+            current_tariffs AS (
+                SELECT t.service, t.rate
+                FROM tariffs t
+                WHERE t.valid_from = (
+                    SELECT MAX(t2.valid_from) FROM tariffs t2
+                    WHERE t2.service = t.service AND t2.valid_from < :end
+                )
+            ),
+            lines AS (
+                SELECT
+                    a.id AS account_id,
+                    a.subsidy,
+                    s.code AS service,
+                    t.rate,
+                    COALESCE(mv.volume, s.norm_volume) AS volume
+                FROM billed_accounts a
+                CROSS JOIN services s
+                JOIN current_tariffs t ON t.service = s.code
+                LEFT JOIN metered mv ON mv.address_id = a.address_id AND mv.type = s.meter_type
+            )
+            SELECT
+                account_id,
+                :period,
+                service,
+                rate,
+                volume,
+                ROUND(rate * volume, 2),
+                CASE WHEN subsidy THEN ROUND(rate * volume * :subsidy_rate, 2) ELSE 0 END
+            FROM lines
+            """,
+            params
+        )
+        count = cursor.rowcount
+        connection.execute(
+            POST_ACCRUALS.format(condition=f"c.period = :period AND c.account_id IN ({billed_accounts})"),
+            params
+        )
+    return count
+
+
+def is_period_billed(connection, period):
+    return connection.execute(
+        "SELECT 1 FROM charges WHERE period = ? LIMIT 1", (period,)
+    ).fetchone() is not None
+
+
+def ensure_period_billed(connection, period):
+    if not is_period_billed(connection, period):
+        run_billing(connection, period)
+
+
+def unbilled_accounts(connection, period, account_ids):
+    placeholders = ", ".join("?" for _ in account_ids)
+    return [
+        row[0] for row in connection.execute(
+            f"""
+            SELECT a.id FROM accounts a
+            WHERE a.id IN ({placeholders})
+              AND NOT EXISTS (SELECT 1 FROM charges c WHERE c.account_id = a.id AND c.period = ?)
+            """,
+            [*account_ids, period]
+        )
+    ]
+
+
+def check_billed(connection, period, account_ids):
+    unbilled = []
+    for start in range(0, len(account_ids), LOOKUP_CHUNK):
+        unbilled += unbilled_accounts(connection, period, account_ids[start:start + LOOKUP_CHUNK])
+    if unbilled:
+        raise ValueError(
+            f"Нет начислений за {format_period(period)} для {len(unbilled)} лицевых счетов "
+            f"(например, {unbilled[0]}). Сначала рассчитайте начисления за месяц"
+        )
+
+
+def load_charges(connection, account_id, period):
+    return connection.execute(
+        f"""
+        SELECT {CHARGE_COLUMNS}
+        FROM charges c
+        JOIN services s ON s.code = c.service
+        WHERE c.account_id = ? AND c.period = ?
+        ORDER BY s.sort_order
+        """,
+        (account_id, period)
+    ).fetchall()
+
+
+def load_charges_for_accounts(connection, account_ids, period):
+    placeholders = ", ".join("?" for _ in account_ids)
+    rows = connection.execute(
+        f"""
+        SELECT c.account_id, {CHARGE_COLUMNS}
+        FROM charges c
+        JOIN services s ON s.code = c.service
+        WHERE c.period = ? AND c.account_id IN ({placeholders})
+        ORDER BY c.account_id, s.sort_order
+        """,
+        [period, *account_ids]
+    ).fetchall()
+
+    charges = {}
+    for row in rows:
+        charges.setdefault(row[0], []).append(row[1:])
+    return charges
@@ -0,0 +1,62 @@
+RELOAD_THRESHOLD = 500
+CHANGES_KEPT = 100_000
+
+TRACKED = (
+    ("accounts", "accounts", "id"),
+    ("requests", "requests", "id"),
+    ("meters", "meters", "id"),
+    ("meter_latest", "meters", "meter_id"),
+)
+EVENTS = (("insert", "INSERT", "new"), ("update", "UPDATE", "new"), ("delete", "DELETE", "old"))
+
+
+def create_change_log(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS changes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        table_name TEXT NOT NULL,
+        row_id TEXT NOT NULL
+    )
+    ''')
+    for table, logged_as, column in TRACKED:
+        for suffix, event, row in EVENTS:
+            cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS changes_{table}_{suffix} AFTER {event} ON {table} BEGIN
+                INSERT INTO changes (table_name, row_id) VALUES ('{logged_as}', {row}.{column});
+            END
+            ''')
+
+
+def data_version(connection):
+    return connection.execute("PRAGMA data_version").fetchone()[0]
+
+
+def last_change_id(connection):
+    return connection.execute("SELECT COALESCE(MAX(id), 0) FROM changes").fetchone()[0]
+
+
+def changes_since(connection, change_id, limit=RELOAD_THRESHOLD):
+    first, last = connection.execute("SELECT MIN(id), COALESCE(MAX(id), 0) FROM changes").fetchone()
+    if first is not None and first > change_id + 1:
+        return last, None
+
+    changed = {}
+    for table, count in connection.execute(
+        "SELECT table_name, COUNT(DISTINCT row_id) FROM changes WHERE id > ? AND id <= ? GROUP BY table_name",
+        (change_id, last)
+    ).fetchall():
+        if count > limit:
+            changed[table] = None
+            continue
+        changed[table] = {
+            row[0] for row in connection.execute(
+                "SELECT DISTINCT row_id FROM changes WHERE id > ? AND id <= ? AND table_name = ?",
+                (change_id, last, table)
+            )
+        }
+    return last, changed
+
+
+def prune(connection, keep=CHANGES_KEPT):
+    with connection:
+        connection.execute("DELETE FROM changes WHERE id <= (SELECT MAX(id) FROM changes) - ?", (keep,))
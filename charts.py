@@ -0,0 +1,121 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+
+from matplotlib.dates import AutoDateLocator, ConciseDateFormatter
+from matplotlib.figure import Figure
+
+import readings_archive
+
+MAX_POINTS = 400
+CACHE_SIZE = 16
+
+BUCKETS = {
+    "day": ("date", 1),
+    "week": ("date(date, 'weekday 0', '-6 days')", 7),
+    "month": (None, 30),
+}
+BUCKET_TITLES = {"day": "по дням", "week": "по неделям", "month": "по месяцам"}
+
+MONTHLY_SERIES = """
+SELECT month || '-01', last_value, last_value - LAG(last_value) OVER (ORDER BY month)
+FROM meter_monthly
+WHERE meter_id = ?
+ORDER BY month
+"""
+
+
+class SeriesCache:
+    def __init__(self, size=CACHE_SIZE):
+        self.size = size
+        self._series = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            series = self._series.get(key)
+            if series is not None:
+                self._series.move_to_end(key)
+            return series
+
+    def put(self, key, series):
+        with self._lock:
+            self._series[key] = series
+            self._series.move_to_end(key)
+            while len(self._series) > self.size:
+                self._series.popitem(last=False)
+
+
+SERIES_CACHE = SeriesCache()
+
+
+def chart_key(connection, meter_id):
+    return connection.execute(
+        "SELECT SUM(readings), MIN(first_date), MAX(last_date) FROM meter_monthly WHERE meter_id = ?",
+        (meter_id,)
+    ).fetchone()
+
+
+def choose_bucket(first_date, last_date, max_points=MAX_POINTS):
+    span = (date.fromisoformat(last_date) - date.fromisoformat(first_date)).days + 1
+    for name, (_, days) in BUCKETS.items():
+        if span / days <= max_points:
+            return name
+    return "month"
+
+
+def load_series(connection, meter_id, bucket):
+    expression = BUCKETS[bucket][0]
+    if expression is None:
+        query = MONTHLY_SERIES
+    else:
+        query = f"""
+        WITH buckets AS (
+            SELECT {expression} AS bucket, MAX(date) AS last_date, value
+            FROM {readings_archive.ALL_READINGS}
+            WHERE meter_id = ?
+            GROUP BY bucket
+        )
+        SELECT bucket, value, value - LAG(value) OVER (ORDER BY bucket)
+        FROM buckets
+        ORDER BY bucket
+        """
+    rows = connection.execute(query, (meter_id,)).fetchall()
+    dates = [date.fromisoformat(row[0]) for row in rows]
+    values = [row[1] for row in rows]
+    consumption = [row[2] for row in rows[1:]]
+    return dates, values, consumption
+
+
+def build_figure(meter_id, bucket, dates, values, consumption):
+    figure = Figure(figsize=(8, 6), layout="tight")
+    ax1, ax2 = figure.subplots(2, 1, sharex=True)
+
+    ax1.plot(dates, values, "o-" if len(dates) <= 60 else "-")
+    ax1.set_title(f"Показания счетчика {meter_id}")
+    ax1.set_ylabel("Показания")
+    ax1.grid(True)
+
+    ax2.bar(dates[1:], consumption, width=BUCKETS[bucket][1] * 0.8)
+    ax2.set_title(f"Потребление {BUCKET_TITLES[bucket]}")
+    ax2.set_ylabel("Потребление")
+    ax2.grid(True)
+
+    locator = AutoDateLocator()
+    ax2.xaxis.set_major_locator(locator)
+    ax2.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+    return figure
+
+
+def consumption_figure(connection, meter_id, cache=SERIES_CACHE):
+    count, first_date, last_date = chart_key(connection, meter_id)
+    if not count or count < 2:
+        return None
+
+    key = (meter_id, count, last_date)
+    series = cache.get(key)
+    if series is None:
+        bucket = choose_bucket(first_date, last_date)
+        series = (bucket, *load_series(connection, meter_id, bucket))
+        cache.put(key, series)
+    return build_figure(meter_id, *series)
@@ -0,0 +1,433 @@
+import argparse
+import json
+import os
+import sys
+
+import backup
+import billing
+import counters
+import db
+import dispatch
+import payments
+import readings_archive
+import readings_import
+import reports
+import schema
+from profiler import PROFILER
+
+
+def open_database(args):
+    connection = db.connect(args.db)
+    schema.create_tables(connection)
+    return connection
+
+
+def cmd_report(args):
+    connection = open_database(args)
+    try:
+        print(reports.build_report(connection, args.name))
+    finally:
+        connection.close()
+    return 0
+
+
+def cmd_billing(args):
+    period = args.period or billing.current_period()
+    connection = open_database(args)
+    try:
+        count = billing.run_billing(connection, period)
+    finally:
+        connection.close()
+    print(f"Начисления за {billing.format_period(period)} рассчитаны: {count} строк")
+    return 0
+
+
+def cmd_receipts(args):
+    import receipts
+
+    connection = open_database(args)
+    try:
+        if args.all:
+            account_ids = [row[0] for row in connection.execute("SELECT id FROM accounts ORDER BY id")]
+        else:
+            account_ids = args.account
+    finally:
+        connection.close()
+
+    if not account_ids:
+        print("Нет счетов для формирования квитанций", file=sys.stderr)
+        return 1
+
+    def progress(done, total):
+        if not args.quiet:
+            print(f"\rСформировано {done} из {total}", end="", file=sys.stderr, flush=True)
+
+    result = receipts.generate_receipts_batch(
+        args.db,
+        account_ids,
+        args.out,
+        period=args.period,
+        merged=args.merged,
+        workers=args.workers,
+        progress=progress
+    )
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(
+        f"Сформировано квитанций: {result.count} из {result.total} "
+        f"за {result.elapsed:.1f} с ({result.rate:.1f} квит./с), папка: {result.output_dir}"
+    )
+    return 0
+
+
+def cmd_import_readings(args):
+    def progress(count):
+        if not args.quiet:
+            print(f"\rОбработано строк: {count}", end="", file=sys.stderr, flush=True)
+
+    connection = open_database(args)
+    try:
+        result = readings_import.import_readings(connection, args.file, dry_run=args.dry_run, progress=progress)
+    finally:
+        connection.close()
+    if not args.quiet:
+        print(file=sys.stderr)
+
+    action = "Проверено" if result.dry_run else "Загружено"
+    print(
+        f"{action} показаний: {result.imported} из {result.total}, ошибок: {len(result.errors)} "
+        f"({result.rate:.0f} строк/с)"
+    )
+    if result.errors and args.errors:
+        readings_import.write_error_report(result.errors, args.errors)
+        print(f"Отчет об ошибках: {args.errors}")
+    return 1 if result.errors else 0
+
+
+def cmd_post_payments(args):
+    def progress(count):
+        if not args.quiet:
+            print(f"\rОбработано строк: {count}", end="", file=sys.stderr, flush=True)
+
+    connection = open_database(args)
+    try:
+        result = payments.post_payments(connection, args.file, dry_run=args.dry_run, progress=progress)
+    finally:
+        connection.close()
+    if not args.quiet:
+        print(file=sys.stderr)
+
+    action = "Проверено" if result.dry_run else "Проведено"
+    print(
+        f"{action} платежей: {result.imported} из {result.total} на {payments.format_kopecks(result.amount)} руб., "
+        f"уже проведены ранее: {result.duplicates}, ошибок: {len(result.errors) - result.duplicates} "
+        f"({result.rate:.0f} строк/с)"
+    )
+    if result.errors and args.errors:
+        readings_import.write_error_report(result.errors, args.errors, key_column="account_id")
+        print(f"Отчет об ошибках: {args.errors}")
+    return 1 if result.errors else 0
+
+
+def cmd_counters(args):
+    connection = open_database(args)
+    try:
+        if args.action == "rebuild":
+            with connection:
+                counters.rebuild(connection)
+            print("Счетчики статистики пересчитаны")
+            return 0
+
+        mismatches = counters.check(connection)
+    finally:
+        connection.close()
+
+    if not mismatches:
+        print("Счетчики статистики согласованы")
+        return 0
+    for name, expected, actual in mismatches:
+        print(f"{name}: ожидается {expected}, в таблице {actual}")
+    print(f"Расхождений: {len(mismatches)}. Выполните 'counters rebuild' для пересчета")
+    return 1
+
+
+def cmd_dispatch(args):
+    if args.check:
+        mismatches = dispatch.check_classifier()
+        for problem, expected, actual in mismatches:
+            print(f"{problem}: ожидается {expected or 'без специализации'}, получено {actual or 'без специализации'}")
+        if mismatches:
+            print(f"Ошибок классификации: {len(mismatches)} из {len(dispatch.CLASSIFY_EXAMPLES)}")
+            return 1
+        print(f"Классификация заявок верна на всех примерах ({len(dispatch.CLASSIFY_EXAMPLES)})")
+        return 0
+
+    connection = open_database(args)
+    try:
+        result = dispatch.dispatch_backlog(connection, dry_run=args.dry_run)
+    finally:
+        connection.close()
+
+    action = "можно назначить" if args.dry_run else "назначено"
+    print(
+        f"Открытых заявок без исполнителя: {result.total}, {action}: {result.assigned}, "
+        f"без специализации: {result.unclassified}, нет подрядчика: {result.no_contractor} "
+        f"({result.elapsed:.1f} с)"
+    )
+    return 0
+
+
+def cmd_generate(args):
+    import synthetic
+
+    def progress(stage):
+        if not args.quiet:
+            print(f"{stage}...", file=sys.stderr, flush=True)
+
+    result = synthetic.generate(
+        args.out,
+        accounts=args.accounts,
+        meters=args.meters,
+        readings=args.readings,
+        requests=args.requests,
+        contractors=args.contractors,
+        payments_per_account=args.payments,
+        seed=args.seed,
+        force=args.force,
+        progress=progress
+    )
+    counts = ", ".join(f"{table}: {count}" for table, count in result.counts.items())
+    print(f"База {result.path} сформирована за {result.elapsed:.1f} с ({counts})")
+    return 0
+
+
+def cmd_benchmark(args):
+    import benchmark
+
+    open_database(args).close()
+
+    def progress(name):
+        if not args.quiet:
+            print(name, file=sys.stderr, flush=True)
+
+    results = benchmark.run(args.db, repeat=args.repeat, only=args.only, progress=progress)
+    regressions = []
+    if args.compare:
+        regressions = benchmark.compare(results, benchmark.load(args.compare), args.threshold)
+
+    if args.out:
+        benchmark.save(results, args.out)
+    else:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+
+    for name, before, after, ratio in regressions:
+        print(f"Замедление {name}: {before:.1f} -> {after:.1f} мс (x{ratio:.2f})", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+def cmd_archive(args):
+    def progress(month, moved):
+        if not args.quiet:
+            print(f"\rАрхивировано до {month}: {moved} показаний", end="", file=sys.stderr, flush=True)
+
+    connection = open_database(args)
+    try:
+        result = readings_archive.archive_readings(connection, args.db, args.years, vacuum=args.vacuum, progress=progress)
+    finally:
+        connection.close()
+    if not args.quiet and result.moved:
+        print(file=sys.stderr)
+
+    if not result.path:
+        print(f"Нет показаний старше {result.cutoff}")
+        return 0
+    print(
+        f"Перенесено показаний: {result.moved} (месяцев: {result.months}, до {result.cutoff}) "
+        f"в {result.path} за {result.elapsed:.1f} с"
+    )
+    return 0
+
+
+def cmd_rollups(args):
+    connection = open_database(args)
+    try:
+        if args.action == "rebuild":
+            with connection:
+                readings_archive.rebuild_rollups(connection)
+            print("Помесячные итоги показаний пересчитаны")
+            return 0
+
+        missing, extra = readings_archive.check_rollups(connection)
+    finally:
+        connection.close()
+
+    if not missing and not extra:
+        print("Помесячные итоги показаний согласованы")
+        return 0
+    print(f"Расхождений: не хватает {missing}, лишних {extra}. Выполните 'rollups rebuild' для пересчета")
+    return 1
+
+
+TIMING_LABELS = {
+    "copy": "копирование",
+    "verify": "проверка",
+    "compress": "сжатие",
+    "decompress": "распаковка",
+    "restore": "восстановление",
+    "check": "итоговая проверка",
+}
+
+
+def _format_timings(timings):
+    return ", ".join(f"{TIMING_LABELS.get(name, name)} {elapsed:.1f} с" for name, elapsed in timings.items())
+
+
+def cmd_backup(args):
+    directory = args.dir or backup.default_directory(args.db)
+    if args.action == "create":
+        open_database(args).close()
+
+        def progress(done, total):
+            if not args.quiet:
+                print(f"\rКопирование: {done}/{total} страниц", end="", file=sys.stderr, flush=True)
+
+        result = backup.create_snapshot(args.db, directory, keep=args.keep, progress=progress)
+        if not args.quiet:
+            print(file=sys.stderr)
+        print(
+            f"Резервная копия {result.path} создана за {result.elapsed:.1f} с "
+            f"({_format_timings(result.timings)}; файлов: {len(result.files)}, "
+            f"{result.size / 1024 / 1024:.1f} МБ, перезапусков: {result.restarts})"
+        )
+        return 0
+
+    if args.action == "list":
+        snapshots = backup.list_snapshots(directory, backup.snapshot_prefix(args.db))
+        if not snapshots:
+            print(f"В {directory} нет резервных копий")
+        for path in snapshots:
+            archive = " + архив" if os.path.exists(backup.archive_sibling(path)) else ""
+            print(f"{path} ({os.path.getsize(path) / 1024 / 1024:.1f} МБ{archive})")
+        return 0
+
+    if not args.file:
+        print("Укажите файл резервной копии", file=sys.stderr)
+        return 2
+
+    if args.action == "verify":
+        result = backup.verify_snapshot(args.file)
+    else:
+        if not args.yes:
+            print("Восстановление перезапишет текущую базу. Повторите команду с --yes", file=sys.stderr)
+            return 2
+        result = backup.restore_snapshot(args.file, args.db)
+
+    status = "проверка пройдена" if result.ok else "ОШИБКИ: " + "; ".join(result.messages[:5])
+    action = "Проверка" if args.action == "verify" else "Восстановление"
+    print(
+        f"{action} {result.path}: {status}, версия схемы {result.user_version}, "
+        f"{result.elapsed:.1f} с ({_format_timings(result.timings)})"
+    )
+    return 0 if result.ok else 1
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="main.py", description="Система учета для ЖКХ: пакетные операции")
+    parser.add_argument("--db", default=db.DB_PATH, help="путь к файлу базы данных")
+    parser.add_argument("-q", "--quiet", action="store_true", help="не выводить прогресс")
+    parser.add_argument("--profile", metavar="FILE", help="сохранить профиль запросов и действий в JSON")
+    parser.add_argument("--slow-ms", type=float, help="порог медленного запроса для EXPLAIN QUERY PLAN, мс")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    report = commands.add_parser("report", help="вывести отчет")
+    report.add_argument("name", choices=sorted(reports.REPORTS))
+    report.set_defaults(handler=cmd_report)
+
+    billing_parser = commands.add_parser("billing", help="рассчитать начисления за месяц")
+    billing_parser.add_argument("--period", help="период в формате ГГГГ-ММ (по умолчанию текущий)")
+    billing_parser.set_defaults(handler=cmd_billing)
+
+    receipts_parser = commands.add_parser("receipts", help="сформировать квитанции")
+    selection = receipts_parser.add_mutually_exclusive_group(required=True)
+    selection.add_argument("--all", action="store_true", help="для всех лицевых счетов")
+    selection.add_argument("--account", nargs="+", help="номера лицевых счетов")
+    receipts_parser.add_argument("--out", default="receipts", help="папка для квитанций")
+    receipts_parser.add_argument("--period", help="период в формате ГГГГ-ММ (по умолчанию текущий)")
+    receipts_parser.add_argument("--merged", action="store_true", help="объединить квитанции в один PDF-файл")
+    receipts_parser.add_argument("--workers", type=int, help="число процессов")
+    receipts_parser.set_defaults(handler=cmd_receipts)
+
+    import_parser = commands.add_parser("import-readings", help="загрузить показания из CSV/JSON")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--dry-run", action="store_true", help="только проверить файл")
+    import_parser.add_argument("--errors", help="сохранить отчет об ошибках в CSV")
+    import_parser.set_defaults(handler=cmd_import_readings)
+
+    payments_parser = commands.add_parser("post-payments", help="провести платежи из выписки банка (CSV)")
+    payments_parser.add_argument("file")
+    payments_parser.add_argument("--dry-run", action="store_true", help="только проверить файл")
+    payments_parser.add_argument("--errors", help="сохранить отчет об ошибках в CSV")
+    payments_parser.set_defaults(handler=cmd_post_payments)
+
+    counters_parser = commands.add_parser("counters", help="проверить или пересчитать счетчики статистики")
+    counters_parser.add_argument("action", choices=("check", "rebuild"))
+    counters_parser.set_defaults(handler=cmd_counters)
+
+    archive_parser = commands.add_parser("archive", help="перенести старые показания в архивную базу")
+    archive_parser.add_argument("--years", type=int, required=True, help="оставить в рабочей базе показания за N лет")
+    archive_parser.add_argument("--vacuum", action="store_true", help="сжать рабочую базу после переноса")
+    archive_parser.set_defaults(handler=cmd_archive)
+
+    rollups_parser = commands.add_parser("rollups", help="проверить или пересчитать помесячные итоги показаний")
+    rollups_parser.add_argument("action", choices=("check", "rebuild"))
+    rollups_parser.set_defaults(handler=cmd_rollups)
+
+    dispatch_parser = commands.add_parser("dispatch", help="назначить подрядчиков открытым заявкам")
+    dispatch_parser.add_argument("--dry-run", action="store_true", help="только показать результат распределения")
+    dispatch_parser.add_argument("--check", action="store_true", help="проверить классификацию заявок на примерах")
+    dispatch_parser.set_defaults(handler=cmd_dispatch)
+
+    backup_parser = commands.add_parser("backup", help="резервные копии базы: создать, показать, проверить, восстановить")
+    backup_parser.add_argument("action", choices=("create", "list", "verify", "restore"))
+    backup_parser.add_argument("file", nargs="?", help="файл резервной копии (для verify и restore)")
+    backup_parser.add_argument("--dir", help="папка для резервных копий (по умолчанию backups рядом с базой)")
+    backup_parser.add_argument("--keep", type=int, default=backup.KEEP_SNAPSHOTS, help="сколько последних копий хранить")
+    backup_parser.add_argument("--yes", action="store_true", help="подтвердить восстановление поверх текущей базы")
+    backup_parser.set_defaults(handler=cmd_backup)
+
+    generate_parser = commands.add_parser("generate", help="сформировать базу с синтетическими данными")
+    generate_parser.add_argument("out", help="путь к новой базе данных")
+    generate_parser.add_argument("--accounts", type=int, default=1000, help="число лицевых счетов")
+    generate_parser.add_argument("--meters", type=int, default=2000, help="число счетчиков")
+    generate_parser.add_argument("--readings", type=int, default=24, help="показаний на счетчик")
+    generate_parser.add_argument("--requests", type=int, default=5000, help="число заявок")
+    generate_parser.add_argument("--contractors", type=int, default=10, help="число подрядчиков")
+    generate_parser.add_argument("--payments", type=int, default=6, help="платежей на лицевой счет")
+    generate_parser.add_argument("--seed", type=int, default=1, help="начальное значение генератора")
+    generate_parser.add_argument("--force", action="store_true", help="перезаписать существующий файл")
+    generate_parser.set_defaults(handler=cmd_generate)
+
+    benchmark_parser = commands.add_parser("benchmark", help="замерить производительность на копии базы")
+    benchmark_parser.add_argument("--repeat", type=int, default=5, help="число повторов каждого замера")
+    benchmark_parser.add_argument("--only", nargs="+", help="префиксы имен замеров (page, report, insert...)")
+    benchmark_parser.add_argument("--out", help="сохранить результаты в JSON-файл")
+    benchmark_parser.add_argument("--compare", help="JSON-файл с базовыми результатами")
+    benchmark_parser.add_argument("--threshold", type=float, default=0.2, help="допустимое замедление (доля)")
+    benchmark_parser.set_defaults(handler=cmd_benchmark)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.profile:
+        PROFILER.enable(args.slow_ms)
+    try:
+        with PROFILER.action(f"Команда: {args.command}"):
+            return args.handler(args)
+    except Exception as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if args.profile:
+            PROFILER.dump(args.profile)
@@ -0,0 +1,104 @@
+import time
+
+import numpy as np
+
+ZERO_PERIODS = 3
+SPIKE_SIGMA = 3.0
+MIN_HISTORY = 4
+REPORT_LIMIT = 100
+
+ROLLBACK = "rollback"
+SPIKE = "spike"
+ZERO_USAGE = "zero"
+
+KIND_TITLES = {
+    ROLLBACK: "Откат показаний",
+    SPIKE: "Скачок расхода",
+    ZERO_USAGE: "Нет расхода",
+}
+KIND_PRIORITY = {ROLLBACK: 0, SPIKE: 1, ZERO_USAGE: 2}
+READING_DTYPE = np.dtype([("meter_id", object), ("date", object), ("value", float)])
+
+
+class Anomaly:
+    def __init__(self, meter_id, kind, date, value, score):
+        self.meter_id = meter_id
+        self.kind = kind
+        self.date = date
+        self.value = value
+        self.score = score
+
+
+class Analysis:
+    def __init__(self, reading_count, meter_count, anomalies, elapsed):
+        self.reading_count = reading_count
+        self.meter_count = meter_count
+        self.anomalies = anomalies
+        self.elapsed = elapsed
+
+
+def load_readings(connection):
+    cursor = connection.execute(
+        "SELECT meter_id, date, value FROM meter_readings ORDER BY meter_id, date, id"
+    )
+    readings = np.fromiter(cursor, dtype=READING_DTYPE)
+    return readings["meter_id"], readings["date"], readings["value"]
+
+
+def meter_codes(meter_ids):
+    starts = np.flatnonzero(meter_ids[1:] != meter_ids[:-1]) + 1
+    codes = np.zeros(len(meter_ids), dtype=np.int64)
+    codes[starts] = 1
+    return np.cumsum(codes), np.concatenate(([0], starts))
+
+
+def find_anomalies(meter_ids, dates, values, zero_periods=ZERO_PERIODS, spike_sigma=SPIKE_SIGMA,
+                   min_history=MIN_HISTORY):
+    if len(values) < 2:
+        return []
+
+    codes, starts = meter_codes(meter_ids)
+    same_meter = codes[1:] == codes[:-1]
+    delta = values[1:] - values[:-1]
+    pair_codes = codes[1:]
+    anomalies = []
+
+    rollback = np.flatnonzero(same_meter & (delta < 0))
+    for i in rollback:
+        anomalies.append(Anomaly(meter_ids[i + 1], ROLLBACK, dates[i + 1], delta[i], -delta[i]))
+
+    usage = same_meter & (delta >= 0)
+    weights = np.where(usage, delta, 0.0)
+    count = np.bincount(pair_codes, weights=usage.astype(float), minlength=len(starts))
+    total = np.bincount(pair_codes, weights=weights, minlength=len(starts))
+    squares = np.bincount(pair_codes, weights=weights * weights, minlength=len(starts))
+
+    others = count[pair_codes] - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = (total[pair_codes] - weights) / others
+        variance = (squares[pair_codes] - weights * weights) / others - mean * mean
+        sigma = np.sqrt(np.maximum(variance, 0.0))
+        score = (delta - mean) / sigma
+    spikes = np.flatnonzero(usage & (others >= min_history) & (sigma > 0) & (score > spike_sigma))
+    for i in spikes:
+        anomalies.append(Anomaly(meter_ids[i + 1], SPIKE, dates[i + 1], delta[i], score[i]))
+
+    zero = np.concatenate(([0], (same_meter & (delta == 0)).astype(np.int8), [0]))
+    edges = np.diff(zero)
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    lengths = run_ends - run_starts
+    for start, end, length in zip(run_starts, run_ends, lengths):
+        if length >= zero_periods:
+            anomalies.append(Anomaly(meter_ids[end], ZERO_USAGE, dates[start], int(length), length / zero_periods))
+
+    anomalies.sort(key=lambda a: (KIND_PRIORITY[a.kind], -a.score))
+    return anomalies
+
+
+def analyze(connection, zero_periods=ZERO_PERIODS, spike_sigma=SPIKE_SIGMA, min_history=MIN_HISTORY):
+    start = time.perf_counter()
+    meter_ids, dates, values = load_readings(connection)
+    anomalies = find_anomalies(meter_ids, dates, values, zero_periods, spike_sigma, min_history)
+    meter_count = len(meter_codes(meter_ids)[1]) if len(meter_ids) else 0
+    return Analysis(len(values), meter_count, anomalies, time.perf_counter() - start)
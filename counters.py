@@ -0,0 +1,138 @@
+ACCOUNTS = "accounts"
+ACCOUNTS_SUBSIDY = "accounts.subsidy"
+METERS = "meters"
+METERS_TYPE = "meters.type:"
+REQUESTS = "requests"
+REQUESTS_STATUS = "requests.status:"
+REQUESTS_CONTRACTOR = "requests.contractor:"
+
+EXPECTED_QUERY = f"""
+SELECT '{ACCOUNTS}', COUNT(*) FROM accounts
+UNION ALL SELECT '{ACCOUNTS_SUBSIDY}', COALESCE(SUM(subsidy != 0), 0) FROM accounts
+UNION ALL SELECT '{METERS}', COUNT(*) FROM meters
+UNION ALL SELECT '{METERS_TYPE}' || type, COUNT(*) FROM meters GROUP BY type
+UNION ALL SELECT '{REQUESTS}', COUNT(*) FROM requests
+UNION ALL SELECT '{REQUESTS_STATUS}' || status, COUNT(*) FROM requests GROUP BY status
+UNION ALL SELECT '{REQUESTS_CONTRACTOR}' || contractor, COUNT(*) FROM requests
+    WHERE contractor IS NOT NULL GROUP BY contractor
+"""
+
+
+def _bump(name_sql, delta_sql):
+    return (
+        f"INSERT INTO counters (name, value) VALUES ({name_sql}, {delta_sql}) "
+        f"ON CONFLICT (name) DO UPDATE SET value = value + excluded.value;"
+    )
+
+
+def _bump_if(condition_sql, name_sql, delta):
+    return (
+        f"INSERT INTO counters (name, value) SELECT {name_sql}, {delta} WHERE {condition_sql} "
+        f"ON CONFLICT (name) DO UPDATE SET value = value + excluded.value;"
+    )
+
+
+TRIGGERS = {
+    "counters_accounts_insert": f"""
+        AFTER INSERT ON accounts BEGIN
+            {_bump(f"'{ACCOUNTS}'", "1")}
+            {_bump(f"'{ACCOUNTS_SUBSIDY}'", "new.subsidy != 0")}
+        END
+    """,
+    "counters_accounts_delete": f"""
+        AFTER DELETE ON accounts BEGIN
+            {_bump(f"'{ACCOUNTS}'", "-1")}
+            {_bump(f"'{ACCOUNTS_SUBSIDY}'", "-(old.subsidy != 0)")}
+        END
+    """,
+    "counters_accounts_update": f"""
+        AFTER UPDATE OF subsidy ON accounts BEGIN
+            {_bump(f"'{ACCOUNTS_SUBSIDY}'", "(new.subsidy != 0) - (old.subsidy != 0)")}
+        END
+    """,
+    "counters_meters_insert": f"""
+        AFTER INSERT ON meters BEGIN
+            {_bump(f"'{METERS}'", "1")}
+            {_bump(f"'{METERS_TYPE}' || new.type", "1")}
+        END
+    """,
+    "counters_meters_delete": f"""
+        AFTER DELETE ON meters BEGIN
+            {_bump(f"'{METERS}'", "-1")}
+            {_bump(f"'{METERS_TYPE}' || old.type", "-1")}
+        END
+    """,
+    "counters_meters_update": f"""
+        AFTER UPDATE OF type ON meters WHEN new.type IS NOT old.type BEGIN
+            {_bump(f"'{METERS_TYPE}' || old.type", "-1")}
+            {_bump(f"'{METERS_TYPE}' || new.type", "1")}
+        END
+    """,
+    "counters_requests_insert": f"""
+        AFTER INSERT ON requests BEGIN
+            {_bump(f"'{REQUESTS}'", "1")}
+            {_bump(f"'{REQUESTS_STATUS}' || new.status", "1")}
+            {_bump_if("new.contractor IS NOT NULL", f"'{REQUESTS_CONTRACTOR}' || new.contractor", 1)}
+        END
+    """,
+    "counters_requests_delete": f"""
+        AFTER DELETE ON requests BEGIN
+            {_bump(f"'{REQUESTS}'", "-1")}
+            {_bump(f"'{REQUESTS_STATUS}' || old.status", "-1")}
+            {_bump_if("old.contractor IS NOT NULL", f"'{REQUESTS_CONTRACTOR}' || old.contractor", -1)}
+        END
+    """,
+    "counters_requests_status": f"""
+        AFTER UPDATE OF status ON requests WHEN new.status IS NOT old.status BEGIN
+            {_bump(f"'{REQUESTS_STATUS}' || old.status", "-1")}
+            {_bump(f"'{REQUESTS_STATUS}' || new.status", "1")}
+        END
+    """,
+    "counters_requests_contractor": f"""
+        AFTER UPDATE OF contractor ON requests WHEN new.contractor IS NOT old.contractor BEGIN
+            {_bump_if("old.contractor IS NOT NULL", f"'{REQUESTS_CONTRACTOR}' || old.contractor", -1)}
+            {_bump_if("new.contractor IS NOT NULL", f"'{REQUESTS_CONTRACTOR}' || new.contractor", 1)}
+        END
+    """,
+}
+
+
+def create_counters(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS counters (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    ''')
+    for name, body in TRIGGERS.items():
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
+    rebuild(cursor)
+
+
+def rebuild(cursor):
+    cursor.execute("DELETE FROM counters")
+    cursor.execute(f"INSERT INTO counters (name, value) {EXPECTED_QUERY}")
+
+
+def load(connection):
+    return dict(connection.execute("SELECT name, value FROM counters"))
+
+
+def check(connection):
+    actual = load(connection)
+    expected = dict(connection.execute(EXPECTED_QUERY))
+    return [
+        (name, expected.get(name, 0), actual.get(name, 0))
+        for name in sorted(set(actual) | set(expected))
+        if expected.get(name, 0) != actual.get(name, 0)
+    ]
+
+
+def get(counters, name):
+    return counters.get(name, 0)
+
+
+def grouped(counters, prefix):
+    return sorted(
+        (name[len(prefix):], value) for name, value in counters.items() if name.startswith(prefix) and value
+    )
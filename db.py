@@ -0,0 +1,88 @@
+import queue
+import sqlite3
+from contextlib import contextmanager
+
+import profiler
+import readings_archive
+
+DB_PATH = "housing.db"
+BUSY_TIMEOUT_MS = 5000
+POOL_SIZE = 4
+
+PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -65536),
+    ("mmap_size", 268435456),
+    ("temp_store", "MEMORY"),
+    ("busy_timeout", BUSY_TIMEOUT_MS),
+)
+
+
+def connect(db_path=DB_PATH, readonly=False, check_same_thread=True):
+    connection = sqlite3.connect(
+        db_path,
+        timeout=BUSY_TIMEOUT_MS / 1000,
+        check_same_thread=check_same_thread,
+        factory=profiler.connection_factory()
+    )
+    for name, value in PRAGMAS:
+        connection.execute(f"PRAGMA {name} = {value}")
+    readings_archive.attach(connection, db_path)
+    if readonly:
+        connection.execute("PRAGMA query_only = ON")
+    return connection
+
+
+@contextmanager
+def transaction(connection):
+    if connection.in_transaction:
+        yield connection
+        return
+
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        yield connection
+    except BaseException:
+        connection.rollback()
+        raise
+    else:
+        connection.commit()
+
+
+class Database:
+    def __init__(self, db_path=DB_PATH):
+        self.path = db_path
+        self.connection = connect(db_path)
+
+    def close(self):
+        self.connection.close()
+
+
+class ConnectionPool:
+    def __init__(self, db_path=DB_PATH, size=POOL_SIZE, readonly=False):
+        self.path = db_path
+        self.readonly = readonly
+        self._idle = queue.LifoQueue()
+        self._all = []
+        for _ in range(size):
+            self._idle.put(None)
+
+    @contextmanager
+    def connection(self):
+        connection = self._idle.get()
+        if connection is None:
+            connection = connect(self.path, readonly=self.readonly, check_same_thread=False)
+            self._all.append(connection)
+        else:
+            readings_archive.refresh(connection)
+        try:
+            yield connection
+        finally:
+            if connection.in_transaction:
+                connection.rollback()
+            self._idle.put(connection)
+
+    def interrupt_all(self):
+        for connection in list(self._all):
+            connection.interrupt()
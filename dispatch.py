@@ -0,0 +1,211 @@
+import heapq
+import re
+import time
+from functools import lru_cache
+
+import search
+from db import transaction
+from storage import STATUS_CLOSED, STATUS_IN_PROGRESS, STATUS_OPEN
+
+SPECIALTY_KEYWORDS = {
+    "Кровля": ("крыш", "кровл", "чердак", "водосток"),
+    "Лифты": ("лифт",),
+    "Газовое оборудование": ("газ", "плит", "колонк"),
+    "Отопление": ("отоплен", "батаре", "радиатор", "стояк"),
+    "Электрика": ("свет", "электр", "розетк", "искрит", "провод", "щиток", "лампоч", "домофон", "автомат"),
+    "Сантехника": ("теч", "протеч", "кран", "засор", "канализ", "унитаз", "смесител", "труб", "ванн", "вод"),
+}
+WORD_RULES = tuple((re.compile(pattern), specialty) for pattern, specialty in (
+    (r"водопровод\w*", "Сантехника"),
+    (r"водосток\w*", "Кровля"),
+    (r"газон\w*", None),
+    (r"газет\w*", None),
+    (r"холодно", "Отопление"),
+    (r"холодн\w*", None),
+    (r"плитк\w*", None),
+))
+CLASSIFY_EXAMPLES = (
+    ("Прорвало водопровод в подвале", "Сантехника"),
+    ("Нет воды, водопровод", "Сантехника"),
+    ("Течет кран на кухне", "Сантехника"),
+    ("Засор канализации", "Сантехника"),
+    ("Оголенный провод в подъезде", "Электрика"),
+    ("Не горит свет в подъезде", "Электрика"),
+    ("Сломан домофон", "Электрика"),
+    ("Забит водосток", "Кровля"),
+    ("Протекает крыша", "Кровля"),
+    ("Запах газа на лестнице", "Газовое оборудование"),
+    ("Не зажигается газовая колонка", "Газовое оборудование"),
+    ("Не работает лифт", "Лифты"),
+    ("Холодные батареи", "Отопление"),
+    ("Вытоптан газон у подъезда", None),
+    ("Экран домофона разбит", "Электрика"),
+    ("Нет холодной воды", "Сантехника"),
+    ("В квартире холодно", "Отопление"),
+    ("Разбита плитка в подъезде", None),
+    ("Не работает газовая плита", "Газовое оборудование"),
+)
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class DispatchResult:
+    def __init__(self, total, assigned, unclassified, no_contractor, elapsed):
+        self.total = total
+        self.assigned = assigned
+        self.unclassified = unclassified
+        self.no_contractor = no_contractor
+        self.elapsed = elapsed
+
+
+def create_workload(cursor):
+    cursor.execute("ALTER TABLE requests ADD COLUMN contractor_id INTEGER REFERENCES contractors(id)")
+    cursor.execute("ALTER TABLE contractors ADD COLUMN open_jobs INTEGER NOT NULL DEFAULT 0")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_requests_contractor_id ON requests (contractor_id, status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_contractors_specialty_load ON contractors (specialty, open_jobs)")
+
+    cursor.execute('''
+    UPDATE requests SET contractor_id = (
+        SELECT MIN(c.id) FROM contractors c WHERE c.name = requests.contractor
+    )
+    WHERE contractor IS NOT NULL
+    ''')
+
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS contractors_jobs_insert AFTER INSERT ON requests
+    WHEN new.contractor_id IS NOT NULL AND new.status != '{STATUS_CLOSED}' BEGIN
+        UPDATE contractors SET open_jobs = open_jobs + 1 WHERE id = new.contractor_id;
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS contractors_jobs_delete AFTER DELETE ON requests
+    WHEN old.contractor_id IS NOT NULL AND old.status != '{STATUS_CLOSED}' BEGIN
+        UPDATE contractors SET open_jobs = open_jobs - 1 WHERE id = old.contractor_id;
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS contractors_jobs_update AFTER UPDATE OF status, contractor_id ON requests
+    WHEN new.contractor_id IS NOT old.contractor_id OR new.status IS NOT old.status BEGIN
+        UPDATE contractors SET open_jobs = open_jobs - 1
+        WHERE id = old.contractor_id AND old.status != '{STATUS_CLOSED}';
+        UPDATE contractors SET open_jobs = open_jobs + 1
+        WHERE id = new.contractor_id AND new.status != '{STATUS_CLOSED}';
+    END
+    ''')
+    rebuild_workload(cursor)
+
+
+def rebuild_workload(cursor):
+    cursor.execute(f'''
+    UPDATE contractors SET open_jobs = (
+        SELECT COUNT(*) FROM requests r
+        WHERE r.contractor_id = contractors.id AND r.status != '{STATUS_CLOSED}'
+    )
+    ''')
+
+
+@lru_cache(maxsize=4096)
+def _word_specialties(word):
+    for pattern, specialty in WORD_RULES:
+        if pattern.fullmatch(word):
+            return (specialty,) if specialty else ()
+    return tuple(
+        specialty for specialty, keywords in SPECIALTY_KEYWORDS.items()
+        if any(word.startswith(keyword) for keyword in keywords)
+    )
+
+
+def classify(problem):
+    scores = {}
+    for word in WORD_PATTERN.findall(search.fold(problem or "").lower()):
+        for specialty in _word_specialties(word):
+            scores[specialty] = scores.get(specialty, 0) + 1
+    best, best_score = None, 0
+    for specialty in SPECIALTY_KEYWORDS:
+        if scores.get(specialty, 0) > best_score:
+            best, best_score = specialty, scores[specialty]
+    return best
+
+
+def check_classifier(examples=CLASSIFY_EXAMPLES):
+    mismatches = []
+    for problem, expected in examples:
+        actual = classify(problem)
+        if actual != expected:
+            mismatches.append((problem, expected, actual))
+    return mismatches
+
+
+def least_loaded(connection, specialty):
+    return connection.execute(
+        "SELECT id, name FROM contractors WHERE specialty = ? ORDER BY open_jobs, id LIMIT 1",
+        (specialty,)
+    ).fetchone()
+
+
+def suggest(connection, problem):
+    specialty = classify(problem)
+    return least_loaded(connection, specialty) if specialty else None
+
+
+def assign(connection, request_id, contractor_id, contractor):
+    connection.execute(
+        "UPDATE requests SET contractor_id = ?, contractor = ?, status = ? WHERE id = ?",
+        (contractor_id, contractor, STATUS_IN_PROGRESS, request_id)
+    )
+
+
+def dispatch_request(connection, request_id):
+    with transaction(connection):
+        row = connection.execute(
+            "SELECT problem FROM requests WHERE id = ? AND status = ? AND contractor_id IS NULL",
+            (request_id, STATUS_OPEN)
+        ).fetchone()
+        if row is None:
+            return None
+        contractor = suggest(connection, row[0])
+        if contractor is None:
+            return None
+        assign(connection, request_id, *contractor)
+    return contractor[1]
+
+
+def dispatch_backlog(connection, dry_run=False, progress=None):
+    start = time.perf_counter()
+    with transaction(connection):
+        queues = {}
+        for contractor_id, name, specialty, open_jobs in connection.execute(
+            "SELECT id, name, specialty, open_jobs FROM contractors WHERE specialty IS NOT NULL"
+        ):
+            queues.setdefault(specialty, []).append((open_jobs, contractor_id, name))
+        for queue in queues.values():
+            heapq.heapify(queue)
+
+        backlog = connection.execute(
+            "SELECT id, problem FROM requests WHERE status = ? AND contractor_id IS NULL ORDER BY date, id",
+            (STATUS_OPEN,)
+        ).fetchall()
+
+        assignments = []
+        unclassified = 0
+        no_contractor = 0
+        for request_id, problem in backlog:
+            specialty = classify(problem)
+            if specialty is None:
+                unclassified += 1
+                continue
+            queue = queues.get(specialty)
+            if not queue:
+                no_contractor += 1
+                continue
+            open_jobs, contractor_id, name = queue[0]
+            heapq.heapreplace(queue, (open_jobs + 1, contractor_id, name))
+            assignments.append((contractor_id, name, STATUS_IN_PROGRESS, request_id))
+
+        if progress:
+            progress(len(assignments), len(backlog))
+        if not dry_run:
+            connection.executemany(
+                "UPDATE requests SET contractor_id = ?, contractor = ?, status = ? WHERE id = ?",
+                assignments
+            )
+    return DispatchResult(len(backlog), len(assignments), unclassified, no_contractor, time.perf_counter() - start)
@@ -0,0 +1,1251 @@
+import importlib
+import threading
+import time
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+
+import backup
+import billing
+import changes
+import counters
+import dispatch
+import payments
+import db
+import readings_archive
+import readings_import
+import reports
+import paging
+import schema
+import search
+import storage
+from background import BackgroundExecutor
+from profiler import PROFILER
+from storage import format_date, today_iso
+
+DASHBOARD_INTERVAL_MS = 2000
+CHANGES_INTERVAL_MS = 1000
+BACKUP_INTERVAL_MS = 6 * 60 * 60 * 1000
+WARM_UP_MODULES = ("charts", "matplotlib.backends.backend_tkagg", "receipts")
+
+
+def warm_up_imports():
+    for name in WARM_UP_MODULES:
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"Не удалось загрузить модуль {name}: {e}")
+    try:
+        importlib.import_module("receipts").resolve_font()
+    except Exception as e:
+        print(f"Не удалось подготовить шрифт: {e}")
+
+class PagedTreeSource(paging.PageQuery):
+    PREFETCH_THRESHOLD = 0.9
+    SEARCH_DELAY_MS = 250
+
+    def __init__(self, tree, executor, format_row, **spec):
+        super().__init__(**spec)
+        self.tree = tree
+        self.executor = executor
+        self.format_row = format_row
+        self.name = self.from_clause.split()[0]
+        self.loading = None
+        self.generation = 0
+
+        for column in self.sort_columns:
+            tree.heading(column, command=lambda c=column: self.sort_by(c))
+
+    def attach_scrollbar(self, scrollbar):
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            if float(last) >= self.PREFETCH_THRESHOLD and not self.exhausted and not self.loading:
+                self.tree.after_idle(self.load_page)
+
+        self.tree.configure(yscrollcommand=on_scroll)
+
+    def sort_by(self, column):
+        self.toggle_sort(column)
+        self.reload()
+
+    def set_filter(self, text):
+        self.filter_text = text.strip()
+        self.reload()
+
+    def set_search(self, text):
+        text = search.match_expression(text)
+        if text != self.search_text:
+            self.search_text = text
+            self.reload()
+
+    def reload(self):
+        if self.loading:
+            self.loading.cancel()
+            self.loading = None
+        self.generation += 1
+        self.tree.delete(*self.tree.get_children())
+        self.reset()
+        self.load_page()
+
+    def load_page(self):
+        if self.exhausted or self.loading:
+            return
+
+        query, params = self.page_query()
+        generation = self.generation
+
+        def on_done(rows):
+            if generation != self.generation:
+                return
+            self.loading = None
+            with PROFILER.action(f"Заполнение списка: {self.name}"):
+                for row in rows:
+                    iid = str(row[-1])
+                    if self.tree.exists(iid):
+                        self.forget(iid)
+                        self.tree.delete(iid)
+                    self.tree.insert("", tk.END, iid=iid, values=self.format_row(row[:-2]))
+            self.advance(rows)
+
+        def on_finished(*args):
+            if generation == self.generation:
+                self.loading = None
+
+        def on_error(job, error):
+            on_finished()
+            self.executor.on_error(job, error)
+
+        self.loading = self.executor.submit(
+            lambda connection, job: connection.execute(query, params).fetchall(),
+            on_done=on_done,
+            on_error=on_error,
+            on_cancel=on_finished,
+            action=f"Обновление списка: {self.name}"
+        )
+
+
+    def refresh_rows(self, connection, keys):
+        if keys is None or len(keys) > changes.RELOAD_THRESHOLD:
+            self.reload()
+            return
+
+        query, params = self.rows_query(list(keys))
+        rows = {str(row[-1]): row for row in connection.execute(query, params)}
+        selection = set(self.tree.selection())
+        for iid in keys:
+            row = rows.get(iid)
+            position = self.positions.get(iid)
+            if row is not None and position == (row[-2], row[-1]):
+                self.tree.item(iid, values=self.format_row(row[:-2]))
+                continue
+
+            if self.forget(iid) is not None or self.tree.exists(iid):
+                self.tree.delete(iid)
+            if row is None:
+                continue
+            index = self.place(row)
+            if index is not None:
+                self.tree.insert("", index, iid=iid, values=self.format_row(row[:-2]))
+                if iid in selection:
+                    self.tree.selection_add(iid)
+
+
+class HousingApp:
+    def __init__(self, root, started=None, warm_up=True):
+        self.root = root
+        self.started = started if started is not None else time.perf_counter()
+        self.startup_time = None
+        self.warm_up = warm_up
+        self.root.title("Система учета для ЖКХ")
+        self.root.geometry("1200x700")
+
+        self.db_path = db.DB_PATH
+        self.db = db.Database(self.db_path)
+        self.db_connection = self.db.connection
+        schema.create_tables(self.db_connection)
+
+        self.executor = BackgroundExecutor(
+            root,
+            self.db_path,
+            on_error=self.show_background_error,
+            on_busy=self.update_status
+        )
+        self.create_status_bar()
+        self.create_dashboard()
+        
+        self.notebook = ttk.Notebook(root)
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+
+        self.create_accounts_tab()
+        self.create_requests_tab()
+        self.create_meters_tab()
+        self.create_reports_tab()
+        self.sources = {
+            "accounts": self.accounts_source,
+            "requests": self.requests_source,
+            "meters": self.meters_source,
+        }
+        self.start_change_tracking()
+        self.backup_job = None
+        self.root.after(BACKUP_INTERVAL_MS, self.scheduled_backup)
+        if PROFILER.enabled:
+            self.create_diagnostics_tab()
+
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.root.after_idle(self.on_started)
+
+    def on_started(self):
+        self.startup_time = time.perf_counter() - self.started
+        print(f"Время запуска: {self.startup_time * 1000:.0f} мс")
+        if self.warm_up:
+            threading.Thread(target=warm_up_imports, name="housing-warm-up", daemon=True).start()
+
+    def create_status_bar(self):
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+
+        self.status_label = ttk.Label(status_frame, text="Готово")
+        self.status_label.pack(side=tk.LEFT, padx=5)
+        self.cancel_button = ttk.Button(status_frame, text="Отмена", command=self.executor.cancel_all, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.RIGHT, padx=5)
+        self.status_progress = ttk.Progressbar(status_frame, mode="indeterminate", length=150)
+        self.status_progress.pack(side=tk.RIGHT, padx=5)
+
+    def create_dashboard(self):
+        dashboard_frame = ttk.LabelFrame(self.root, text="Сводка")
+        dashboard_frame.pack(side=tk.TOP, fill=tk.X, padx=5, pady=5)
+
+        self.dashboard_labels = {}
+        for key in ("accounts", "requests", "meters", "debt"):
+            label = ttk.Label(dashboard_frame)
+            label.pack(side=tk.LEFT, padx=15)
+            self.dashboard_labels[key] = label
+
+        self.refresh_dashboard()
+
+    def refresh_dashboard(self):
+        self.root.after(DASHBOARD_INTERVAL_MS, self.refresh_dashboard)
+
+        with PROFILER.action("Обновление сводки"):
+            values = counters.load(self.db_connection)
+            debt = self.db_connection.execute("SELECT COALESCE(SUM(amount), 0) FROM ledger_periods").fetchone()[0]
+        by_status = dict(counters.grouped(values, counters.REQUESTS_STATUS))
+
+        self.dashboard_labels["accounts"].config(
+            text=f"Лицевых счетов: {counters.get(values, counters.ACCOUNTS)} "
+                 f"(с субсидией: {counters.get(values, counters.ACCOUNTS_SUBSIDY)})"
+        )
+        self.dashboard_labels["requests"].config(
+            text=f"Заявки: открыто {by_status.get(storage.STATUS_OPEN, 0)}, "
+                 f"в работе {by_status.get(storage.STATUS_IN_PROGRESS, 0)}, "
+                 f"закрыто {by_status.get(storage.STATUS_CLOSED, 0)}"
+        )
+        self.dashboard_labels["meters"].config(text=f"Счетчиков: {counters.get(values, counters.METERS)}")
+        self.dashboard_labels["debt"].config(text=f"Задолженность: {payments.format_kopecks(debt)} руб.")
+
+    def start_change_tracking(self):
+        changes.prune(self.db_connection)
+        self.change_id = changes.last_change_id(self.db_connection)
+        self.data_version = changes.data_version(self.db_connection)
+        self.root.after(CHANGES_INTERVAL_MS, self.poll_changes)
+
+    def poll_changes(self):
+        self.root.after(CHANGES_INTERVAL_MS, self.poll_changes)
+        version = changes.data_version(self.db_connection)
+        if version != self.data_version:
+            self.data_version = version
+            readings_archive.refresh(self.db_connection)
+            self.apply_changes()
+
+    def apply_changes(self):
+        with PROFILER.action("Применение изменений"):
+            self.change_id, changed = changes.changes_since(self.db_connection, self.change_id)
+            if changed is None:
+                changed = dict.fromkeys(self.sources)
+            for table, keys in changed.items():
+                source = self.sources.get(table)
+                if source is not None:
+                    source.refresh_rows(self.db_connection, keys)
+
+    def update_status(self, descriptions):
+        if self.executor.busy:
+            text = "Выполняется: " + ", ".join(dict.fromkeys(descriptions)) if descriptions else "Загрузка..."
+            self.status_label.config(text=text)
+            self.status_progress.start(10)
+            self.cancel_button.config(state=tk.NORMAL)
+        else:
+            self.status_label.config(text="Готово")
+            self.status_progress.stop()
+            self.cancel_button.config(state=tk.DISABLED)
+
+    def show_background_error(self, job, error):
+        messagebox.showerror("Ошибка", f"{job.description or 'Операция'}: {error}")
+
+    def on_close(self):
+        self.executor.shutdown()
+        self.root.destroy()
+        
+    def create_accounts_tab(self):
+        tab = ttk.Frame(self.notebook)
+        self.notebook.add(tab, text="Лицевые счета")
+
+        control_frame = ttk.LabelFrame(tab, text="Управление")
+        control_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Button(control_frame, text="Добавить счет", command=self.add_account).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Удалить счет", command=self.delete_account).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Сформировать квитанцию", command=self.generate_receipt).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Квитанции для всех", command=self.generate_receipts_batch).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Начислить за месяц", command=self.run_billing).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Обновить", command=self.refresh_accounts).pack(side=tk.LEFT, padx=5)
+
+        payments_frame = ttk.LabelFrame(tab, text="Платежи")
+        payments_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        ttk.Button(payments_frame, text="Внести платеж", command=self.add_payment).pack(side=tk.LEFT, padx=5)
+        ttk.Button(payments_frame, text="Загрузить выписку банка", command=self.import_payments).pack(side=tk.LEFT, padx=5)
+
+        search_frame = ttk.Frame(tab)
+        search_frame.pack(fill=tk.X, padx=5)
+
+        columns = ("id", "address", "owner", "balance", "subsidy", "last_payment")
+        self.accounts_tree = ttk.Treeview(tab, columns=columns, show="headings", height=20)
+        
+        self.accounts_tree.heading("id", text="№ счета")
+        self.accounts_tree.heading("address", text="Адрес")
+        self.accounts_tree.heading("owner", text="Владелец")
+        self.accounts_tree.heading("balance", text="Баланс")
+        self.accounts_tree.heading("subsidy", text="Субсидия")
+        self.accounts_tree.heading("last_payment", text="Последний платеж")
+        
+        self.accounts_tree.column("id", width=80)
+        self.accounts_tree.column("address", width=200)
+        self.accounts_tree.column("owner", width=150)
+        self.accounts_tree.column("balance", width=100)
+        self.accounts_tree.column("subsidy", width=100)
+        self.accounts_tree.column("last_payment", width=120)
+        
+        scrollbar = ttk.Scrollbar(tab, command=self.accounts_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.accounts_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        self.accounts_source = PagedTreeSource(
+            self.accounts_tree,
+            self.executor,
+            format_row=lambda account: (
+                account[0], 
+                account[1], 
+                account[2], 
+                f"{payments.format_kopecks(account[3])} руб.", 
+                "Да" if account[4] else "Нет", 
+                format_date(account[5])
+            ),
+            **paging.ACCOUNTS
+        )
+        self.accounts_source.attach_scrollbar(scrollbar)
+        self._add_filter_entry(control_frame, self.accounts_source)
+        self._add_search_entry(search_frame, self.accounts_source)
+
+        self.refresh_accounts()
+
+    def _add_filter_entry(self, control_frame, source):
+        filter_entry = ttk.Entry(control_frame, width=30)
+        filter_entry.pack(side=tk.RIGHT, padx=5)
+        ttk.Label(control_frame, text="Фильтр:").pack(side=tk.RIGHT)
+        filter_entry.bind("<Return>", lambda event: source.set_filter(filter_entry.get()))
+
+    def _add_search_entry(self, search_frame, source):
+        ttk.Label(search_frame, text="Поиск:").pack(side=tk.LEFT)
+        search_entry = ttk.Entry(search_frame)
+        search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+        pending = [None]
+
+        def on_key(event):
+            if pending[0]:
+                self.root.after_cancel(pending[0])
+            pending[0] = self.root.after(source.SEARCH_DELAY_MS, lambda: source.set_search(search_entry.get()))
+
+        search_entry.bind("<KeyRelease>", on_key)
+        search_entry.bind("<Escape>", lambda event: (search_entry.delete(0, tk.END), source.set_search("")))
+
+    def refresh_accounts(self):
+        self.accounts_source.reload()
+
+    def add_account(self):
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Добавить лицевой счет")
+        dialog.geometry("400x300")
+        
+        ttk.Label(dialog, text="№ счета:").grid(row=0, column=0, padx=5, pady=5, sticky=tk.E)
+        id_entry = ttk.Entry(dialog)
+        id_entry.grid(row=0, column=1, padx=5, pady=5, sticky=tk.W)
+        
+        ttk.Label(dialog, text="Адрес:").grid(row=1, column=0, padx=5, pady=5, sticky=tk.E)
+        address_entry = ttk.Entry(dialog)
+        address_entry.grid(row=1, column=1, padx=5, pady=5, sticky=tk.W)
+        
+        ttk.Label(dialog, text="Владелец:").grid(row=2, column=0, padx=5, pady=5, sticky=tk.E)
+        owner_entry = ttk.Entry(dialog)
+        owner_entry.grid(row=2, column=1, padx=5, pady=5, sticky=tk.W)
+        
+        ttk.Label(dialog, text="Начальный баланс:").grid(row=3, column=0, padx=5, pady=5, sticky=tk.E)
+        balance_entry = ttk.Entry(dialog)
+        balance_entry.grid(row=3, column=1, padx=5, pady=5, sticky=tk.W)
+        balance_entry.insert(0, "0.00")
+        
+        subsidy_var = tk.BooleanVar()
+        ttk.Checkbutton(dialog, text="Субсидия", variable=subsidy_var).grid(row=4, column=1, padx=5, pady=5, sticky=tk.W)
+        
+        def save():
+            storage.add_account(
+                self.db_connection,
+                id_entry.get(),
+                address_entry.get(),
+                owner_entry.get(),
+                float(balance_entry.get()),
+                subsidy_var.get()
+            )
+            self.apply_changes()
+            dialog.destroy()
+            messagebox.showinfo("Успех", "Лицевой счет успешно добавлен")
+        
+        ttk.Button(dialog, text="Сохранить", command=save).grid(row=5, column=1, padx=5, pady=10, sticky=tk.E)
+        
+    def delete_account(self):
+        selected = self.accounts_tree.selection()
+        if not selected:
+            messagebox.showwarning("Ошибка", "Выберите счет для удаления")
+            return
+            
+        account_id = selected[0]
+        
+        if messagebox.askyesno("Подтверждение", f"Удалить счет №{account_id}?"):
+            storage.delete_account(self.db_connection, account_id)
+            self.apply_changes()
+    
+    def add_payment(self):
+        selected = self.accounts_tree.selection()
+        if not selected:
+            messagebox.showwarning("Ошибка", "Выберите счет для внесения платежа")
+            return
+
+        account_id = selected[0]
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Внести платеж")
+        dialog.geometry("350x200")
+
+        ttk.Label(dialog, text=f"Лицевой счет: {account_id}").grid(row=0, column=0, columnspan=2, padx=5, pady=5)
+
+        ttk.Label(dialog, text="Сумма:").grid(row=1, column=0, padx=5, pady=5, sticky=tk.E)
+        amount_entry = ttk.Entry(dialog)
+        amount_entry.grid(row=1, column=1, padx=5, pady=5, sticky=tk.W)
+
+        ttk.Label(dialog, text="№ документа:").grid(row=2, column=0, padx=5, pady=5, sticky=tk.E)
+        document_entry = ttk.Entry(dialog)
+        document_entry.grid(row=2, column=1, padx=5, pady=5, sticky=tk.W)
+
+        def save():
+            try:
+                amount = payments.to_kopecks(amount_entry.get())
+            except ValueError as e:
+                messagebox.showerror("Ошибка", str(e))
+                return
+            if amount <= 0:
+                messagebox.showerror("Ошибка", "Сумма должна быть положительной")
+                return
+
+            try:
+                storage.post_payment(
+                    self.db_connection,
+                    account_id,
+                    amount_entry.get(),
+                    document=document_entry.get().strip() or None
+                )
+            except ValueError as e:
+                messagebox.showerror("Ошибка", str(e))
+                return
+            self.apply_changes()
+            dialog.destroy()
+            messagebox.showinfo("Успех", f"Платеж на {payments.format_kopecks(amount)} руб. проведен")
+
+        ttk.Button(dialog, text="Провести", command=save).grid(row=3, column=1, padx=5, pady=10, sticky=tk.E)
+
+    def import_payments(self):
+        path = filedialog.askopenfilename(
+            title="Выписка банка",
+            filetypes=[("CSV", "*.csv"), ("Все файлы", "*.*")]
+        )
+        if not path:
+            return
+
+        dry_run = messagebox.askyesno("Загрузка платежей", "Только проверить файл, не проводя платежи?")
+
+        def run(connection, job):
+            return payments.post_payments(
+                connection,
+                path,
+                dry_run=dry_run,
+                progress=job.report_progress,
+                cancel_event=job.cancel_event
+            )
+
+        def on_progress(count):
+            self.status_label.config(text=f"Загрузка платежей: обработано {count} строк")
+
+        def on_done(result):
+            if not result.dry_run:
+                self.apply_changes()
+
+            action = "Проверено" if result.dry_run else "Проведено"
+            summary = (
+                f"Обработано строк: {result.total}\n"
+                f"{action} платежей: {result.imported} на {payments.format_kopecks(result.amount)} руб.\n"
+                f"Уже проведены ранее: {result.duplicates}\n"
+                f"Ошибок: {len(result.errors) - result.duplicates}\n"
+                f"Скорость: {result.rate:.0f} строк/с"
+            )
+            if not result.errors:
+                messagebox.showinfo("Загрузка платежей", summary)
+                return
+
+            if messagebox.askyesno("Загрузка платежей", summary + "\n\nСохранить отчет об ошибках?"):
+                report_path = filedialog.asksaveasfilename(
+                    defaultextension=".csv",
+                    filetypes=[("CSV files", "*.csv")],
+                    initialfile="Ошибки_платежей.csv"
+                )
+                if report_path:
+                    readings_import.write_error_report(result.errors, report_path, key_column="account_id")
+
+        self.executor.submit(run, on_done=on_done, on_progress=on_progress, description="Загрузка платежей")
+
+    def generate_receipt(self):
+        selected = self.accounts_tree.selection()
+        if not selected:
+            messagebox.showwarning("Ошибка", "Выберите счет для генерации квитанции")
+            return
+
+        account_id = selected[0]
+
+        def build(connection, job):
+            import receipts
+
+            account = connection.execute(
+                f"SELECT {receipts.ACCOUNT_COLUMNS} FROM accounts WHERE id = ?", 
+                (account_id,)
+            ).fetchone()
+
+            period = billing.current_period()
+            billing.check_billed(connection, period, [account[0]])
+            charges = billing.load_charges(connection, account[0], period)
+
+            return receipts.build_receipt(account, charges, period)
+
+        def save(result):
+            import receipts
+
+            pdf, family = result
+            filename = receipts.receipt_filename(account_id, family)
+            success_msg = "Квитанция успешно сохранена" if family else "Receipt saved successfully"
+
+            save_path = filedialog.asksaveasfilename(
+                defaultextension=".pdf",
+                filetypes=[("PDF files", "*.pdf")],
+                initialfile=filename
+            )
+
+            if save_path:
+                pdf.output(save_path)
+                messagebox.showinfo("Успех", success_msg)
+
+        self.executor.submit(build, on_done=save, description="Квитанция")
+
+    def run_billing(self):
+        period = billing.current_period()
+        if billing.is_period_billed(self.db_connection, period) and not messagebox.askyesno(
+            "Подтверждение", f"Начисления за {billing.format_period(period)} уже рассчитаны. Пересчитать?"
+        ):
+            return
+
+        self.executor.submit(
+            lambda connection, job: billing.run_billing(connection, period),
+            on_done=lambda count: messagebox.showinfo(
+                "Успех", f"Начисления за {billing.format_period(period)} рассчитаны: {count} строк"
+            ),
+            description="Начисления"
+        )
+
+    def generate_receipts_batch(self):
+        output_dir = filedialog.askdirectory(title="Папка для квитанций")
+        if not output_dir:
+            return
+
+        merged = messagebox.askyesno("Квитанции", "Объединить квитанции в один PDF-файл?")
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Формирование квитанций")
+        dialog.geometry("400x150")
+
+        status_label = ttk.Label(dialog, text="Подготовка...")
+        status_label.pack(pady=10)
+        progressbar = ttk.Progressbar(dialog, length=350)
+        progressbar.pack(pady=5)
+        finished = [0, 0]
+
+        def run(connection, job):
+            import receipts
+
+            def report(done, total):
+                finished[:] = done, total
+                job.report_progress((done, total))
+
+            account_ids = self.accounts_source.matching_keys(connection)
+            report(0, len(account_ids))
+            return receipts.generate_receipts_batch(
+                self.db_path,
+                account_ids,
+                output_dir,
+                merged=merged,
+                progress=report,
+                cancel_event=job.cancel_event
+            )
+
+        def on_progress(progress):
+            done, total = progress
+            progressbar.config(maximum=max(total, 1), value=done)
+            status_label.config(text=f"Сформировано {done} из {total}")
+
+        def on_done(result):
+            dialog.destroy()
+            if not result.total:
+                messagebox.showwarning("Ошибка", "Нет счетов для формирования квитанций")
+                return
+
+            title = "Отменено" if result.cancelled else "Успех"
+            messagebox.showinfo(
+                title,
+                f"Сформировано квитанций: {result.count} из {result.total}\n"
+                f"Скорость: {result.rate:.1f} квит./с\n"
+                f"Папка: {result.output_dir}"
+            )
+
+        def on_error(job, error):
+            dialog.destroy()
+            messagebox.showerror("Ошибка", f"Не удалось сформировать квитанции: {error}")
+
+        def on_cancel():
+            dialog.destroy()
+            done, total = finished
+            if merged:
+                summary = "Объединенный файл не сохранен"
+            else:
+                summary = f"Сформировано квитанций: {done} из {total}\nПапка: {output_dir}"
+            messagebox.showinfo("Отменено", summary)
+
+        job = self.executor.submit(
+            run,
+            on_done=on_done,
+            on_error=on_error,
+            on_progress=on_progress,
+            on_cancel=on_cancel,
+            description="Квитанции"
+        )
+        ttk.Button(dialog, text="Отмена", command=job.cancel).pack(pady=10)
+
+    def create_requests_tab(self):
+        tab = ttk.Frame(self.notebook)
+        self.notebook.add(tab, text="Диспетчеризация")
+
+        control_frame = ttk.LabelFrame(tab, text="Управление")
+        control_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Button(control_frame, text="Добавить заявку", command=self.add_request).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Закрыть заявку", command=self.close_request).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Назначить подрядчика", command=self.assign_contractor).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Распределить открытые", command=self.dispatch_backlog).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Обновить", command=self.refresh_requests).pack(side=tk.LEFT, padx=5)
+        self.auto_dispatch_var = tk.BooleanVar()
+        ttk.Checkbutton(
+            control_frame, text="Назначать подрядчика автоматически", variable=self.auto_dispatch_var
+        ).pack(side=tk.LEFT, padx=5)
+
+        search_frame = ttk.Frame(tab)
+        search_frame.pack(fill=tk.X, padx=5)
+
+        columns = ("id", "date", "address", "problem", "status", "contractor")
+        self.requests_tree = ttk.Treeview(tab, columns=columns, show="headings", height=20)
+        
+        self.requests_tree.heading("id", text="№ заявки")
+        self.requests_tree.heading("date", text="Дата")
+        self.requests_tree.heading("address", text="Адрес")
+        self.requests_tree.heading("problem", text="Проблема")
+        self.requests_tree.heading("status", text="Статус")
+        self.requests_tree.heading("contractor", text="Подрядчик")
+        
+        self.requests_tree.column("id", width=80)
+        self.requests_tree.column("date", width=100)
+        self.requests_tree.column("address", width=150)
+        self.requests_tree.column("problem", width=250)
+        self.requests_tree.column("status", width=100)
+        self.requests_tree.column("contractor", width=150)
+        
+        scrollbar = ttk.Scrollbar(tab, command=self.requests_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.requests_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        self.requests_source = PagedTreeSource(
+            self.requests_tree,
+            self.executor,
+            format_row=lambda request: (
+                request[0], 
+                format_date(request[1]), 
+                request[2], 
+                request[3], 
+                request[4], 
+                request[5] if request[5] else "-"
+            ),
+            **paging.REQUESTS
+        )
+        self.requests_source.attach_scrollbar(scrollbar)
+        self._add_filter_entry(control_frame, self.requests_source)
+        self._add_search_entry(search_frame, self.requests_source)
+
+        self.refresh_requests()
+    
+    def refresh_requests(self):
+        self.requests_source.reload()
+
+    def add_request(self):
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Добавить заявку")
+        dialog.geometry("500x300")
+        
+        ttk.Label(dialog, text="Адрес:").grid(row=0, column=0, padx=5, pady=5, sticky=tk.E)
+        address_entry = ttk.Entry(dialog)
+        address_entry.grid(row=0, column=1, padx=5, pady=5, sticky=tk.W)
+        
+        ttk.Label(dialog, text="Проблема:").grid(row=1, column=0, padx=5, pady=5, sticky=tk.E)
+        problem_entry = tk.Text(dialog, height=5, width=40)
+        problem_entry.grid(row=1, column=1, padx=5, pady=5, sticky=tk.W)
+        
+        ttk.Label(dialog, text="Контактное лицо:").grid(row=2, column=0, padx=5, pady=5, sticky=tk.E)
+        contact_entry = ttk.Entry(dialog)
+        contact_entry.grid(row=2, column=1, padx=5, pady=5, sticky=tk.W)
+        
+        def save():
+            request_id = storage.add_request(
+                self.db_connection,
+                address_entry.get(),
+                problem_entry.get("1.0", tk.END).strip(),
+                contact_entry.get()
+            )
+            contractor = None
+            if self.auto_dispatch_var.get():
+                contractor = dispatch.dispatch_request(self.db_connection, request_id)
+            self.apply_changes()
+            dialog.destroy()
+            if contractor:
+                messagebox.showinfo("Успех", f"Заявка {request_id} добавлена, назначен подрядчик {contractor}")
+            else:
+                messagebox.showinfo("Успех", "Заявка успешно добавлена")
+        
+        ttk.Button(dialog, text="Сохранить", command=save).grid(row=3, column=1, padx=5, pady=10, sticky=tk.E)
+    
+    def close_request(self):
+        selected = self.requests_tree.selection()
+        if not selected:
+            messagebox.showwarning("Ошибка", "Выберите заявку для закрытия")
+            return
+            
+        request_id = selected[0]
+        
+        if not storage.close_request(self.db_connection, request_id):
+            messagebox.showinfo("Информация", "Эта заявка уже закрыта")
+            return
+        
+        self.apply_changes()
+        messagebox.showinfo("Успех", "Заявка закрыта")
+
+    def assign_contractor(self):
+        selected = self.requests_tree.selection()
+        if not selected:
+            messagebox.showwarning("Ошибка", "Выберите заявку")
+            return
+            
+        request_id = selected[0]
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Назначить подрядчика")
+        dialog.geometry("400x200")
+        
+        ttk.Label(dialog, text="Выберите подрядчика:").pack(pady=10)
+        
+        contractor_var = tk.StringVar()
+        contractors = storage.contractor_names(self.db_connection)
+        contractor_combobox = ttk.Combobox(dialog, textvariable=contractor_var, values=contractors)
+        contractor_combobox.pack(pady=5)
+
+        problem = str(self.requests_tree.item(selected[0])["values"][3])
+        suggestion = dispatch.suggest(self.db_connection, str(problem))
+        if suggestion:
+            contractor_var.set(suggestion[1])
+            ttk.Label(dialog, text=f"Рекомендуется: {suggestion[1]} (наименьшая загрузка)").pack(pady=5)
+        
+        def save():
+            contractor = contractor_var.get()
+            if not contractor:
+                messagebox.showwarning("Ошибка", "Выберите подрядчика")
+                return
+                
+            storage.assign_contractor(self.db_connection, request_id, contractor)
+            self.apply_changes()
+            dialog.destroy()
+            messagebox.showinfo("Успех", f"Подрядчик {contractor} назначен")
+        
+        ttk.Button(dialog, text="Назначить", command=save).pack(pady=10)
+    
+    def dispatch_backlog(self):
+        if not messagebox.askyesno("Подтверждение", "Назначить подрядчиков всем открытым заявкам без исполнителя?"):
+            return
+
+        def on_done(result):
+            self.apply_changes()
+            messagebox.showinfo(
+                "Распределение заявок",
+                f"Открытых заявок без исполнителя: {result.total}\n"
+                f"Назначено: {result.assigned}\n"
+                f"Не удалось определить специализацию: {result.unclassified}\n"
+                f"Нет подрядчика нужной специализации: {result.no_contractor}\n"
+                f"Время: {result.elapsed:.1f} с"
+            )
+
+        self.executor.submit(
+            lambda connection, job: dispatch.dispatch_backlog(connection),
+            on_done=on_done,
+            description="Распределение заявок"
+        )
+
+    def create_meters_tab(self):
+        tab = ttk.Frame(self.notebook)
+        self.notebook.add(tab, text="Учет ресурсов")
+
+        control_frame = ttk.LabelFrame(tab, text="Управление")
+        control_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Button(control_frame, text="Добавить счетчик", command=self.add_meter).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Внести показания", command=self.add_meter_reading).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Импорт показаний", command=self.import_meter_readings).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Анализ расхода", command=self.analyze_consumption).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Обновить", command=self.refresh_meters).pack(side=tk.LEFT, padx=5)
+
+        columns = ("id", "type", "address", "last_reading", "last_date")
+        self.meters_tree = ttk.Treeview(tab, columns=columns, show="headings", height=20)
+        
+        self.meters_tree.heading("id", text="№ счетчика")
+        self.meters_tree.heading("type", text="Тип")
+        self.meters_tree.heading("address", text="Адрес")
+        self.meters_tree.heading("last_reading", text="Последние показания")
+        self.meters_tree.heading("last_date", text="Дата")
+        
+        self.meters_tree.column("id", width=100)
+        self.meters_tree.column("type", width=120)
+        self.meters_tree.column("address", width=150)
+        self.meters_tree.column("last_reading", width=120)
+        self.meters_tree.column("last_date", width=100)
+        
+        scrollbar = ttk.Scrollbar(tab, command=self.meters_tree.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.meters_tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        self.meters_source = PagedTreeSource(
+            self.meters_tree,
+            self.executor,
+            format_row=lambda meter: (
+                meter[0],
+                meter[1],
+                meter[2], 
+                meter[3] if meter[3] is not None else "-",
+                format_date(meter[4])
+            ),
+            **paging.METERS
+        )
+        self.meters_source.attach_scrollbar(scrollbar)
+        self._add_filter_entry(control_frame, self.meters_source)
+
+        self.refresh_meters()
+
+    def refresh_meters(self):
+        self.meters_source.reload()
+
+    def add_meter(self):
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Добавить счетчик")
+        dialog.geometry("400x250")
+        
+        ttk.Label(dialog, text="№ счетчика:").grid(row=0, column=0, padx=5, pady=5, sticky=tk.E)
+        id_entry = ttk.Entry(dialog)
+        id_entry.grid(row=0, column=1, padx=5, pady=5, sticky=tk.W)
+        
+        ttk.Label(dialog, text="Тип:").grid(row=1, column=0, padx=5, pady=5, sticky=tk.E)
+        type_combobox = ttk.Combobox(dialog, values=["Холодная вода", "Горячая вода", "Электричество", "Газ", "Отопление"])
+        type_combobox.grid(row=1, column=1, padx=5, pady=5, sticky=tk.W)
+        
+        ttk.Label(dialog, text="Адрес:").grid(row=2, column=0, padx=5, pady=5, sticky=tk.E)
+        address_entry = ttk.Entry(dialog)
+        address_entry.grid(row=2, column=1, padx=5, pady=5, sticky=tk.W)
+        
+        ttk.Label(dialog, text="Начальные показания:").grid(row=3, column=0, padx=5, pady=5, sticky=tk.E)
+        reading_entry = ttk.Entry(dialog)
+        reading_entry.grid(row=3, column=1, padx=5, pady=5, sticky=tk.W)
+        reading_entry.insert(0, "0")
+
+        def save():
+            meter_id = id_entry.get()
+
+            storage.add_meter(
+                self.db_connection,
+                meter_id,
+                type_combobox.get(),
+                address_entry.get(),
+                float(reading_entry.get())
+            )
+            
+            self.apply_changes()
+            dialog.destroy()
+            messagebox.showinfo("Успех", "Счетчик успешно добавлен")
+        
+        ttk.Button(dialog, text="Сохранить", command=save).grid(row=4, column=1, padx=5, pady=10, sticky=tk.E)
+    
+    def add_meter_reading(self):
+        selected = self.meters_tree.selection()
+        if not selected:
+            messagebox.showwarning("Ошибка", "Выберите счетчик")
+            return
+            
+        meter_id = selected[0]
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Внести показания")
+        dialog.geometry("300x200")
+        
+        meter = storage.get_meter(self.db_connection, meter_id)
+        
+        ttk.Label(dialog, text=f"Счетчик: {meter[0]}").pack(pady=5)
+        ttk.Label(dialog, text=f"Тип: {meter[1]}").pack(pady=5)
+        ttk.Label(dialog, text=f"Адрес: {meter[2]}").pack(pady=5)
+        
+        ttk.Label(dialog, text="Показания:").pack(pady=5)
+        reading_entry = ttk.Entry(dialog)
+        reading_entry.pack(pady=5)
+        
+        def save():
+            try:
+                reading = float(reading_entry.get())
+            except ValueError:
+                messagebox.showerror("Ошибка", "Введите корректное число")
+                return
+                
+            storage.save_meter_reading(self.db_connection, meter_id, today_iso(), reading)
+            
+            self.apply_changes()
+            dialog.destroy()
+            messagebox.showinfo("Успех", "Показания сохранены")
+        
+        ttk.Button(dialog, text="Сохранить", command=save).pack(pady=10)
+    
+    def import_meter_readings(self):
+        path = filedialog.askopenfilename(
+            title="Файл показаний",
+            filetypes=[("CSV/JSON", "*.csv *.json *.jsonl *.ndjson"), ("Все файлы", "*.*")]
+        )
+        if not path:
+            return
+
+        dry_run = messagebox.askyesno("Импорт показаний", "Только проверить файл, не сохраняя показания?")
+
+        def run(connection, job):
+            return readings_import.import_readings(
+                connection,
+                path,
+                dry_run=dry_run,
+                progress=job.report_progress,
+                cancel_event=job.cancel_event
+            )
+
+        def on_progress(count):
+            self.status_label.config(text=f"Импорт показаний: обработано {count} строк")
+
+        def on_done(result):
+            if not result.dry_run:
+                self.apply_changes()
+
+            action = "Проверено" if result.dry_run else "Импортировано"
+            summary = (
+                f"Обработано строк: {result.total}\n"
+                f"{action} показаний: {result.imported}\n"
+                f"Ошибок: {len(result.errors)}\n"
+                f"Скорость: {result.rate:.0f} строк/с"
+            )
+            if not result.errors:
+                messagebox.showinfo("Импорт показаний", summary)
+                return
+
+            if messagebox.askyesno("Импорт показаний", summary + "\n\nСохранить отчет об ошибках?"):
+                report_path = filedialog.asksaveasfilename(
+                    defaultextension=".csv",
+                    filetypes=[("CSV files", "*.csv")],
+                    initialfile="Ошибки_импорта.csv"
+                )
+                if report_path:
+                    readings_import.write_error_report(result.errors, report_path)
+
+        self.executor.submit(run, on_done=on_done, on_progress=on_progress, description="Импорт показаний")
+
+    def analyze_consumption(self):
+        selected = self.meters_tree.selection()
+        if not selected:
+            messagebox.showwarning("Ошибка", "Выберите счетчик")
+            return
+            
+        meter_id = selected[0]
+
+        def load(connection, job):
+            import charts
+
+            return charts.consumption_figure(connection, meter_id)
+
+        self.executor.submit(
+            load,
+            on_done=lambda figure: self.show_consumption_chart(meter_id, figure),
+            description="Анализ расхода"
+        )
+
+    def show_consumption_chart(self, meter_id, figure):
+        if figure is None:
+            messagebox.showinfo("Информация", "Недостаточно данных для анализа")
+            return
+
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+        graph_window = tk.Toplevel(self.root)
+        graph_window.title(f"Анализ потребления - {meter_id}")
+        
+        canvas = FigureCanvasTkAgg(figure, master=graph_window)
+        with PROFILER.action("Отрисовка графика"):
+            canvas.draw()
+        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    
+    def create_reports_tab(self):
+        tab = ttk.Frame(self.notebook)
+        self.notebook.add(tab, text="Отчетность")
+
+        control_frame = ttk.LabelFrame(tab, text="Отчеты")
+        control_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Button(control_frame, text="Отчет по платежам", command=self.generate_payments_report).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Отчет по заявкам", command=self.generate_requests_report).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Отчет по счетчикам", command=self.generate_meters_report).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Отчет по домам", command=self.generate_buildings_report).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Аномалии потребления", command=self.generate_anomalies_report).pack(side=tk.LEFT, padx=5)
+
+        backup_frame = ttk.LabelFrame(tab, text="Резервное копирование")
+        backup_frame.pack(fill=tk.X, padx=5, pady=5)
+
+        ttk.Button(backup_frame, text="Создать копию", command=self.create_backup).pack(side=tk.LEFT, padx=5)
+        ttk.Button(backup_frame, text="Проверить копию...", command=self.verify_backup).pack(side=tk.LEFT, padx=5)
+        self.backup_label = ttk.Label(backup_frame, text=self.describe_last_backup())
+        self.backup_label.pack(side=tk.LEFT, padx=15)
+
+        self.report_text = tk.Text(tab, wrap=tk.WORD, height=20)
+        self.report_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        scrollbar = ttk.Scrollbar(tab, command=self.report_text.yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.report_text.config(yscrollcommand=scrollbar.set)
+    
+    def describe_last_backup(self):
+        snapshots = backup.list_snapshots(backup.default_directory(self.db_path), backup.snapshot_prefix(self.db_path))
+        return f"Последняя копия: {snapshots[-1]}" if snapshots else "Резервных копий пока нет"
+
+    def scheduled_backup(self):
+        self.root.after(BACKUP_INTERVAL_MS, self.scheduled_backup)
+        self.create_backup(scheduled=True)
+
+    def create_backup(self, scheduled=False):
+        if self.backup_job is not None:
+            if not scheduled:
+                messagebox.showwarning("Резервное копирование", "Резервная копия уже создается")
+            return
+
+        def run(connection, job):
+            return backup.create_snapshot(
+                self.db_path,
+                progress=lambda done, total: job.report_progress((done, total)),
+                cancel_event=job.cancel_event
+            )
+
+        def on_progress(progress):
+            done, total = progress
+            self.status_label.config(text=f"Резервное копирование: {done} из {total} страниц")
+
+        def on_done(result):
+            self.backup_job = None
+            self.backup_label.config(text=self.describe_last_backup())
+            if not scheduled:
+                messagebox.showinfo(
+                    "Резервное копирование",
+                    f"Копия создана: {result.path}\n"
+                    f"Размер: {result.size / 1024 / 1024:.1f} МБ\n"
+                    f"Время: {result.elapsed:.1f} с"
+                )
+
+        def on_error(job, error):
+            self.backup_job = None
+            if scheduled:
+                print(f"Не удалось создать резервную копию: {error}")
+            else:
+                messagebox.showerror("Ошибка", f"Не удалось создать резервную копию: {error}")
+
+        def on_cancel():
+            self.backup_job = None
+
+        self.backup_job = self.executor.submit(
+            run,
+            on_done=on_done,
+            on_error=on_error,
+            on_progress=on_progress,
+            on_cancel=on_cancel,
+            description="Резервное копирование"
+        )
+
+    def verify_backup(self):
+        path = filedialog.askopenfilename(
+            initialdir=backup.default_directory(self.db_path),
+            filetypes=[("Резервные копии", f"*{backup.SNAPSHOT_SUFFIX}")]
+        )
+        if not path:
+            return
+
+        def on_done(result):
+            status = "Проверка пройдена" if result.ok else "Обнаружены ошибки:\n" + "\n".join(result.messages[:10])
+            show = messagebox.showinfo if result.ok else messagebox.showerror
+            show(
+                "Проверка копии",
+                f"{status}\nВерсия схемы: {result.user_version}\nВремя: {result.elapsed:.1f} с"
+            )
+
+        self.executor.submit(
+            lambda connection, job: backup.verify_snapshot(path),
+            on_done=on_done,
+            description="Проверка копии"
+        )
+
+    def create_diagnostics_tab(self):
+        tab = ttk.Frame(self.notebook)
+        self.notebook.add(tab, text="Диагностика")
+
+        control_frame = ttk.Frame(tab)
+        control_frame.pack(fill=tk.X, padx=5, pady=5)
+        ttk.Button(control_frame, text="Обновить", command=self.refresh_diagnostics).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Сбросить", command=self.reset_diagnostics).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Сохранить JSON", command=self.save_diagnostics).pack(side=tk.LEFT, padx=5)
+        ttk.Label(control_frame, text=f"Медленные запросы: от {PROFILER.slow_ms} мс").pack(side=tk.LEFT, padx=15)
+
+        columns = ("name", "calls", "rows", "total", "mean", "max")
+        headings = ("Действие / запрос", "Вызовов", "Строк", "Всего, мс", "Среднее, мс", "Макс., мс")
+        self.diagnostics_trees = {}
+        for kind, title, height in (("actions", "Действия", 6), ("statements", "Запросы", 12)):
+            frame = ttk.LabelFrame(tab, text=title)
+            frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+            tree = ttk.Treeview(frame, columns=columns, show="headings", height=height)
+            for column, heading in zip(columns, headings):
+                tree.heading(column, text=heading)
+                tree.column(column, width=600 if column == "name" else 90, anchor=tk.W if column == "name" else tk.E)
+            tree.pack(fill=tk.BOTH, expand=True)
+            self.diagnostics_trees[kind] = tree
+
+        self.diagnostics_plan = tk.Text(tab, wrap=tk.WORD, height=6)
+        self.diagnostics_plan.pack(fill=tk.X, padx=5, pady=5)
+        self.diagnostics_trees["statements"].bind("<<TreeviewSelect>>", self.show_diagnostics_plan)
+        self.diagnostics_stats = {}
+        self.refresh_diagnostics()
+
+    def refresh_diagnostics(self):
+        self.diagnostics_stats.clear()
+        for kind, tree in self.diagnostics_trees.items():
+            tree.delete(*tree.get_children())
+            for i, stat in enumerate(PROFILER.top(kind)):
+                self.diagnostics_stats[(kind, str(i))] = stat
+                tree.insert("", tk.END, iid=str(i), values=(
+                    stat["name"], stat["calls"], stat["rows"], stat["total_ms"], stat["mean_ms"], stat["max_ms"]
+                ))
+
+    def reset_diagnostics(self):
+        PROFILER.reset()
+        self.refresh_diagnostics()
+
+    def show_diagnostics_plan(self, event):
+        selected = self.diagnostics_trees["statements"].selection()
+        self.diagnostics_plan.delete(1.0, tk.END)
+        if not selected:
+            return
+        stat = self.diagnostics_stats.get(("statements", selected[0]))
+        if stat is None:
+            return
+        plan = "\n".join(stat["plan"]) if stat["plan"] else "План не сохранен (запрос быстрее порога)"
+        self.diagnostics_plan.insert(tk.END, f"{stat['name']}\n\n{plan}")
+
+    def save_diagnostics(self):
+        path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")],
+            initialfile="diagnostics.json"
+        )
+        if not path:
+            return
+        try:
+            PROFILER.dump(path)
+        except OSError as e:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить файл: {e}")
+            return
+        messagebox.showinfo("Успех", f"Диагностика сохранена: {path}")
+
+    def show_report(self, report):
+        self.report_text.delete(1.0, tk.END)
+        self.report_text.insert(tk.END, report)
+
+    def generate_payments_report(self):
+        self.run_report("payments")
+
+    def generate_requests_report(self):
+        self.run_report("requests")
+
+    def generate_meters_report(self):
+        self.run_report("meters")
+
+    def generate_buildings_report(self):
+        self.run_report("buildings")
+
+    def generate_anomalies_report(self):
+        self.run_report("anomalies")
+
+    def run_report(self, name):
+        self.executor.submit(
+            lambda connection, job: reports.build_report(connection, name),
+            on_done=self.show_report,
+            description=reports.REPORTS[name][0]
+        )
+
+    def __del__(self):
+        if hasattr(self, 'db'):
+            self.db.close()
+
+
+def run(started=None):
+    root = tk.Tk()
+    HousingApp(root, started)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    run()
\ No newline at end of file
@@ -0,0 +1,178 @@
+import bisect
+
+import search
+
+ACCOUNTS = {
+    "from_clause": "accounts",
+    "select": "id, address, owner, balance_kopecks, subsidy, last_payment",
+    "key": "id",
+    "sort_columns": {
+        "id": "id",
+        "address": "address",
+        "owner": "owner",
+        "balance": "balance_kopecks",
+        "subsidy": "subsidy",
+        "last_payment": "COALESCE(last_payment, '')",
+    },
+    "filter_columns": ("id", "address", "owner"),
+    "search_table": "accounts",
+}
+
+REQUESTS = {
+    "from_clause": "requests",
+    "select": "id, date, address, problem, status, contractor",
+    "key": "id",
+    "sort_columns": {
+        "id": "id",
+        "date": "date",
+        "address": "address",
+        "problem": "problem",
+        "status": "status",
+        "contractor": "COALESCE(contractor, '')",
+    },
+    "filter_columns": ("id", "address", "problem", "status", "contractor"),
+    "search_table": "requests",
+}
+
+METERS = {
+    "from_clause": "meters m LEFT JOIN meter_latest l ON l.meter_id = m.id",
+    "select": "m.id, m.type, m.address, l.value, l.date",
+    "key": "m.id",
+    "sort_columns": {
+        "id": "m.id",
+        "type": "m.type",
+        "address": "m.address",
+        "last_reading": "COALESCE(l.value, 0)",
+        "last_date": "COALESCE(l.date, '')",
+    },
+    "filter_columns": ("m.id", "m.type", "m.address"),
+}
+
+
+class PageQuery:
+    PAGE_SIZE = 200
+
+    def __init__(self, from_clause, select, key, sort_columns, filter_columns, search_table=None):
+        self.from_clause = from_clause
+        self.select = select
+        self.key = key
+        self.sort_columns = sort_columns
+        self.filter_columns = filter_columns
+        self.search_table = search_table
+
+        self.sort_column = None
+        self.descending = False
+        self.filter_text = ""
+        self.search_text = ""
+        self.last_row = None
+        self.exhausted = False
+        self.loaded = []
+        self.positions = {}
+
+    def toggle_sort(self, column):
+        if self.sort_column == column:
+            self.descending = not self.descending
+        else:
+            self.sort_column = column
+            self.descending = False
+
+    def reset(self):
+        self.last_row = None
+        self.exhausted = False
+        self.loaded = []
+        self.positions = {}
+
+    def advance(self, rows):
+        positions = [(row[-2], row[-1]) for row in rows]
+        if self.descending:
+            self.loaded[:0] = positions[::-1]
+        else:
+            self.loaded.extend(positions)
+        self.positions.update((str(position[1]), position) for position in positions)
+        if rows:
+            self.last_row = positions[-1]
+        if len(rows) < self.PAGE_SIZE:
+            self.exhausted = True
+
+    def forget(self, iid):
+        position = self.positions.pop(iid, None)
+        if position is not None:
+            del self.loaded[bisect.bisect_left(self.loaded, position)]
+        return position
+
+    def place(self, row):
+        position = (row[-2], row[-1])
+        if not self.exhausted:
+            if self.last_row is None:
+                return None
+            if position > self.last_row if not self.descending else position < self.last_row:
+                return None
+        index = bisect.bisect_left(self.loaded, position)
+        self.loaded.insert(index, position)
+        self.positions[str(row[-1])] = position
+        return len(self.loaded) - 1 - index if self.descending else index
+
+    def _filter_conditions(self):
+        conditions, params = [], []
+        if self.filter_text:
+            conditions.append("(" + " OR ".join(f"{c} LIKE ?" for c in self.filter_columns) + ")")
+            params.extend([f"%{self.filter_text}%"] * len(self.filter_columns))
+        if self.search_text:
+            conditions.append(search.search_condition(self.search_table))
+            params.append(self.search_text)
+        return conditions, params
+
+    def matching_keys(self, connection):
+        conditions, params = self._filter_conditions()
+        query = f"SELECT {self.key} FROM {self.from_clause}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += f" ORDER BY {self.key}"
+        return [row[0] for row in connection.execute(query, params)]
+
+    def _sort_expression(self):
+        if self.sort_column is None:
+            return self.key
+        return self.sort_columns[self.sort_column]
+
+    def page_query(self):
+        sort_expr = self._sort_expression()
+        keyed_by_pk = sort_expr == self.key
+        direction = "DESC" if self.descending else "ASC"
+        comparison = "<" if self.descending else ">"
+
+        conditions, params = self._filter_conditions()
+        if self.last_row is not None:
+            if keyed_by_pk:
+                conditions.append(f"{self.key} {comparison} ?")
+                params.append(self.last_row[1])
+            else:
+                conditions.append(f"({sort_expr}, {self.key}) {comparison} (?, ?)")
+                params.extend(self.last_row)
+
+        query = f"SELECT {self.select}, {sort_expr}, {self.key} FROM {self.from_clause}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        if keyed_by_pk:
+            query += f" ORDER BY {self.key} {direction}"
+        else:
+            query += f" ORDER BY {sort_expr} {direction}, {self.key} {direction}"
+        query += " LIMIT ?"
+        params.append(self.PAGE_SIZE)
+        return query, params
+
+    def rows_query(self, keys):
+        conditions, params = self._filter_conditions()
+        conditions.append(f"{self.key} IN ({', '.join('?' for _ in keys)})")
+        params.extend(keys)
+        return (
+            f"SELECT {self.select}, {self._sort_expression()}, {self.key} FROM {self.from_clause} "
+            f"WHERE {' AND '.join(conditions)}",
+            params
+        )
+
+    def fetch_page(self, connection):
+        query, params = self.page_query()
+        rows = connection.execute(query, params).fetchall()
+        self.advance(rows)
+        return rows
@@ -0,0 +1,222 @@
+import os
+import time
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from readings_import import ImportResult, iter_csv, parse_date
+
+BATCH_SIZE = 50_000
+PROGRESS_EVERY = 10_000
+LOOKUP_CHUNK = 500
+REQUIRED_COLUMNS = ("account_id", "date", "amount")
+OPTIONAL_COLUMNS = ("document",)
+
+KIND_OPENING = "opening"
+KIND_PAYMENT = "payment"
+KIND_ADJUSTMENT = "adjustment"
+KIND_WRITEOFF = "writeoff"
+KIND_ACCRUAL = "accrual"
+SOURCE_BILLING = "billing"
+
+
+class PostingResult(ImportResult):
+    def __init__(self, total, imported, errors, elapsed, dry_run, cancelled, duplicates, amount):
+        super().__init__(total, imported, errors, elapsed, dry_run, cancelled)
+        self.duplicates = duplicates
+        self.amount = amount
+
+
+def to_kopecks(value):
+    text = str(value).replace("\xa0", "").replace(" ", "").replace(",", ".")
+    try:
+        return int((Decimal(text) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except InvalidOperation:
+        raise ValueError(f"Некорректная сумма: {value}") from None
+
+
+def format_kopecks(kopecks):
+    return f"{kopecks / 100:.2f}"
+
+
+def post_entry(connection, account_id, entry_date, kind, amount, document=None, source=None):
+    return connection.execute(
+        """
+        INSERT INTO ledger (account_id, date, period, kind, amount, document, source)
+        VALUES (?, ?, substr(?, 1, 7), ?, ?, ?, ?)
+        """,
+        (account_id, entry_date, entry_date, kind, amount, document, source)
+    ).lastrowid
+
+
+def _posted_documents(connection, documents):
+    posted = set()
+    for start in range(0, len(documents), LOOKUP_CHUNK):
+        chunk = documents[start:start + LOOKUP_CHUNK]
+        placeholders = ", ".join("?" for _ in chunk)
+        posted.update(
+            row[0] for row in connection.execute(f"SELECT document FROM ledger WHERE document IN ({placeholders})", chunk)
+        )
+    return posted
+
+
+def _flush(connection, batch):
+    with connection:
+        connection.executemany(
+            f"""
+            INSERT INTO ledger (account_id, date, period, kind, amount, document, source)
+            VALUES (?, ?, substr(?, 1, 7), '{KIND_PAYMENT}', ?, ?, ?)
+            ON CONFLICT (document) DO NOTHING
+            """,
+            batch
+        )
+
+
+def post_payments(connection, path, dry_run=False, batch_size=BATCH_SIZE, progress=None, cancel_event=None):
+    start = time.perf_counter()
+    source = os.path.basename(path)
+    known_accounts = {row[0] for row in connection.execute("SELECT id FROM accounts")}
+
+    errors = []
+    batch = []
+    documents = set()
+    total = 0
+    imported = 0
+    duplicates = 0
+    amount = 0
+    cancelled = False
+
+    def flush():
+        nonlocal imported, duplicates, amount
+        posted = _posted_documents(connection, [row[4] for _, row in batch if row[4] is not None])
+        rows = []
+        for line_no, row in batch:
+            if row[4] in posted:
+                errors.append((line_no, row[0], f"Документ уже проведен: {row[4]}"))
+                duplicates += 1
+            else:
+                rows.append(row)
+        if rows and not dry_run:
+            _flush(connection, rows)
+        imported += len(rows)
+        amount -= sum(row[3] for row in rows)
+
+    for line_no, account_id, payment_date, value, document in iter_csv(path, REQUIRED_COLUMNS, OPTIONAL_COLUMNS):
+        if cancel_event is not None and cancel_event.is_set():
+            cancelled = True
+            break
+        total += 1
+        if progress and total % PROGRESS_EVERY == 0:
+            progress(total)
+
+        if account_id is None or payment_date is None or value is None:
+            errors.append((line_no, account_id, "Неполная строка"))
+            continue
+
+        account_id = account_id.strip()
+        if account_id not in known_accounts:
+            errors.append((line_no, account_id, "Неизвестный лицевой счет"))
+            continue
+
+        try:
+            payment_date = parse_date(payment_date)
+        except ValueError:
+            errors.append((line_no, account_id, f"Некорректная дата: {payment_date}"))
+            continue
+
+        try:
+            kopecks = to_kopecks(value)
+        except ValueError as e:
+            errors.append((line_no, account_id, str(e)))
+            continue
+        if kopecks <= 0:
+            errors.append((line_no, account_id, f"Сумма должна быть положительной: {value}"))
+            continue
+
+        document = (document or "").strip() or None
+        if document is not None:
+            if document in documents:
+                errors.append((line_no, account_id, f"Повтор документа в файле: {document}"))
+                continue
+            documents.add(document)
+
+        batch.append((line_no, (account_id, payment_date, payment_date, -kopecks, document, source)))
+        if len(batch) >= batch_size:
+            flush()
+            batch = []
+
+    if batch and not cancelled:
+        flush()
+
+    if progress:
+        progress(total)
+    return PostingResult(
+        total, imported, errors, time.perf_counter() - start, dry_run, cancelled, duplicates, amount
+    )
+
+
+def create_ledger(cursor):
+    cursor.execute("ALTER TABLE accounts ADD COLUMN balance_kopecks INTEGER NOT NULL DEFAULT 0")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_accounts_debt ON accounts (balance_kopecks)")
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS ledger (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        account_id TEXT NOT NULL,
+        date TEXT NOT NULL,
+        period TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        amount INTEGER NOT NULL,
+        document TEXT UNIQUE,
+        source TEXT,
+        FOREIGN KEY (account_id) REFERENCES accounts(id)
+    )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ledger_account_date ON ledger (account_id, date)")
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS ledger_periods (
+        period TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        entries INTEGER NOT NULL,
+        amount INTEGER NOT NULL,
+        PRIMARY KEY (period, kind)
+    )
+    ''')
+
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS ledger_post AFTER INSERT ON ledger BEGIN
+        UPDATE accounts SET
+            balance_kopecks = balance_kopecks + new.amount,
+            balance = (balance_kopecks + new.amount) / 100.0,
+            last_payment = CASE
+                WHEN new.kind = '{KIND_PAYMENT}' AND (last_payment IS NULL OR new.date > last_payment) THEN new.date
+                ELSE last_payment
+            END
+        WHERE id = new.account_id;
+        INSERT INTO ledger_periods (period, kind, entries, amount) VALUES (new.period, new.kind, 1, new.amount)
+        ON CONFLICT (period, kind) DO UPDATE SET entries = entries + 1, amount = amount + excluded.amount;
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS ledger_no_update BEFORE UPDATE ON ledger BEGIN
+        SELECT RAISE(ABORT, 'Проводки нельзя изменять');
+    END
+    ''')
+    cursor.execute('''
+    CREATE TRIGGER IF NOT EXISTS ledger_no_delete BEFORE DELETE ON ledger BEGIN
+        SELECT RAISE(ABORT, 'Проводки нельзя удалять');
+    END
+    ''')
+    cursor.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS accounts_writeoff AFTER DELETE ON accounts
+    WHEN old.balance_kopecks != 0 BEGIN
+        INSERT INTO ledger (account_id, date, period, kind, amount)
+        VALUES (old.id, date('now', 'localtime'), strftime('%Y-%m', 'now', 'localtime'), '{KIND_WRITEOFF}', -old.balance_kopecks);
+    END
+    ''')
+
+    cursor.execute(f'''
+    INSERT INTO ledger (account_id, date, period, kind, amount)
+    SELECT id, date('now', 'localtime'), strftime('%Y-%m', 'now', 'localtime'), '{KIND_OPENING}', CAST(ROUND(balance * 100) AS INTEGER)
+    FROM accounts
+    WHERE CAST(ROUND(balance * 100) AS INTEGER) != 0
+    ''')
@@ -0,0 +1,215 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+ENV_VARIABLE = "HOUSING_PROFILE"
+SLOW_STATEMENT_MS = 50
+TOP_LIMIT = 30
+
+_NULL_CONTEXT = nullcontext()
+
+
+class Stat:
+    __slots__ = ("name", "calls", "rows", "total", "max", "plan")
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.plan = None
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "calls": self.calls,
+            "rows": self.rows,
+            "total_ms": round(self.total * 1000, 3),
+            "mean_ms": round(self.total * 1000 / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max * 1000, 3),
+            "plan": self.plan,
+        }
+
+
+class Profiler:
+    def __init__(self, slow_ms=SLOW_STATEMENT_MS):
+        self.enabled = False
+        self.slow_ms = slow_ms
+        self.statements = {}
+        self.actions = {}
+        self._lock = threading.Lock()
+
+    def enable(self, slow_ms=None):
+        self.enabled = True
+        if slow_ms is not None:
+            self.slow_ms = slow_ms
+
+    def reset(self):
+        with self._lock:
+            self.statements.clear()
+            self.actions.clear()
+
+    def _stat(self, table, name):
+        stat = table.get(name)
+        if stat is None:
+            stat = table[name] = Stat(name)
+        return stat
+
+    def record_statement(self, sql, elapsed, rows, calls=1, longest=None):
+        with self._lock:
+            stat = self._stat(self.statements, sql)
+            stat.calls += calls
+            stat.rows += rows
+            stat.total += elapsed
+            stat.max = max(stat.max, longest if longest is not None else elapsed)
+            return stat.plan is None and stat.max * 1000 >= self.slow_ms
+
+    def capture_plan(self, connection, sql, parameters):
+        if sql.lstrip()[:7].upper() == "EXPLAIN":
+            return
+        try:
+            rows = connection.cursor(sqlite3.Cursor).execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+            plan = [row[-1] for row in rows]
+        except sqlite3.Error as e:
+            plan = [f"Ошибка: {e}"]
+        with self._lock:
+            self._stat(self.statements, sql).plan = plan
+
+    def record_action(self, name, elapsed):
+        with self._lock:
+            stat = self._stat(self.actions, name)
+            stat.calls += 1
+            stat.total += elapsed
+            stat.max = max(stat.max, elapsed)
+
+    def action(self, name):
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return self._timed_action(name)
+
+    @contextmanager
+    def _timed_action(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_action(name, time.perf_counter() - start)
+
+    def top(self, kind="statements", limit=TOP_LIMIT):
+        with self._lock:
+            stats = [stat.as_dict() for stat in getattr(self, kind).values()]
+        stats.sort(key=lambda stat: stat["total_ms"], reverse=True)
+        return stats[:limit]
+
+    def snapshot(self, limit=TOP_LIMIT):
+        return {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "slow_ms": self.slow_ms,
+            "actions": self.top("actions", limit),
+            "statements": self.top("statements", limit),
+        }
+
+    def dump(self, path, limit=TOP_LIMIT):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(limit), f, ensure_ascii=False, indent=2)
+
+
+PROFILER = Profiler()
+if os.environ.get(ENV_VARIABLE):
+    PROFILER.enable()
+
+
+def _normalize(sql):
+    return " ".join(sql.split())
+
+
+class ProfiledCursor(sqlite3.Cursor):
+    _sql = None
+    _parameters = ()
+    _elapsed = 0.0
+    _pending_rows = 0
+    _pending_time = 0.0
+
+    def execute(self, sql, parameters=()):
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        elapsed = time.perf_counter() - start
+        self._sql = _normalize(sql)
+        self._parameters = parameters
+        self._elapsed = elapsed
+        self._record(elapsed, max(self.rowcount, 0), 1)
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        elapsed = time.perf_counter() - start
+        self._sql = None
+        PROFILER.record_statement(_normalize(sql), elapsed, max(self.rowcount, 0))
+        return self
+
+    def _record(self, elapsed, rows, calls=0):
+        if self._sql is None:
+            return
+        if PROFILER.record_statement(self._sql, elapsed, rows, calls, self._elapsed):
+            PROFILER.capture_plan(self.connection, self._sql, self._parameters)
+
+    def _fetched(self, start, rows):
+        elapsed = time.perf_counter() - start
+        self._elapsed += elapsed
+        self._record(elapsed, rows)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, row is not None)
+        return row
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        rows = super().fetchmany(self.arraysize if size is None else size)
+        self._fetched(start, len(rows))
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows))
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._flush_iteration(start)
+            raise
+        self._pending_time += time.perf_counter() - start
+        self._pending_rows += 1
+        return row
+
+    def _flush_iteration(self, start):
+        elapsed = self._pending_time + time.perf_counter() - start
+        self._elapsed += elapsed
+        self._record(elapsed, self._pending_rows)
+        self._pending_rows = 0
+        self._pending_time = 0.0
+
+
+class ProfiledConnection(sqlite3.Connection):
+    def cursor(self, factory=ProfiledCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connection_factory():
+    return ProfiledConnection if PROFILER.enabled else sqlite3.Connection
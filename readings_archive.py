@@ -0,0 +1,225 @@
+import os
+import time
+from datetime import date
+
+ARCHIVE_SCHEMA = "archive"
+ALL_READINGS = "meter_readings_all"
+
+ROLLUP_COLUMNS = "meter_id, month, readings, first_date, first_value, last_date, last_value, min_value, max_value"
+
+EXPECTED_ROLLUPS = f"""
+WITH ranked AS (
+    SELECT
+        meter_id,
+        substr(date, 1, 7) AS month,
+        date,
+        value,
+        ROW_NUMBER() OVER (PARTITION BY meter_id, substr(date, 1, 7) ORDER BY date, id) AS first_rank,
+        ROW_NUMBER() OVER (PARTITION BY meter_id, substr(date, 1, 7) ORDER BY date DESC, id DESC) AS last_rank
+    FROM {ALL_READINGS}
+)
+SELECT
+    meter_id,
+    month,
+    COUNT(*),
+    MIN(date),
+    MAX(CASE WHEN first_rank = 1 THEN value END),
+    MAX(date),
+    MAX(CASE WHEN last_rank = 1 THEN value END),
+    MIN(value),
+    MAX(value)
+FROM ranked
+GROUP BY meter_id, month
+"""
+
+UPSERT_ROLLUP = f"""
+INSERT INTO meter_monthly ({ROLLUP_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (meter_id, month) DO UPDATE SET
+    readings = readings + excluded.readings,
+    first_value = CASE WHEN excluded.first_date < first_date THEN excluded.first_value ELSE first_value END,
+    first_date = MIN(first_date, excluded.first_date),
+    last_value = CASE WHEN excluded.last_date >= last_date THEN excluded.last_value ELSE last_value END,
+    last_date = MAX(last_date, excluded.last_date),
+    min_value = MIN(min_value, excluded.min_value),
+    max_value = MAX(max_value, excluded.max_value)
+"""
+
+
+class ArchiveResult:
+    def __init__(self, cutoff, moved, months, elapsed, path):
+        self.cutoff = cutoff
+        self.moved = moved
+        self.months = months
+        self.elapsed = elapsed
+        self.path = path
+
+
+def archive_path(db_path):
+    root, extension = os.path.splitext(db_path)
+    return f"{root}-archive{extension or '.db'}"
+
+
+def _is_attached(connection):
+    return any(row[1] == ARCHIVE_SCHEMA for row in connection.execute("PRAGMA database_list"))
+
+
+def _create_view(connection):
+    source = "SELECT id, meter_id, date, value FROM main.meter_readings"
+    if _is_attached(connection):
+        source += f" UNION ALL SELECT id, meter_id, date, value FROM {ARCHIVE_SCHEMA}.meter_readings"
+    connection.execute(f"DROP VIEW IF EXISTS temp.{ALL_READINGS}")
+    connection.execute(f"CREATE TEMP VIEW {ALL_READINGS} AS {source}")
+
+
+def _attach_existing(connection, path):
+    if not os.path.exists(path):
+        return False
+    connection.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (path,))
+    if connection.execute(
+        f"SELECT 1 FROM {ARCHIVE_SCHEMA}.sqlite_master WHERE type = 'table' AND name = 'meter_readings'"
+    ).fetchone() is None:
+        connection.execute(f"DETACH DATABASE {ARCHIVE_SCHEMA}")
+        return False
+    return True
+
+
+def attach(connection, db_path):
+    if db_path != ":memory:":
+        _attach_existing(connection, archive_path(db_path))
+    _create_view(connection)
+
+
+def refresh(connection):
+    if connection.in_transaction or _is_attached(connection):
+        return False
+    main_path = next(row[2] for row in connection.execute("PRAGMA database_list") if row[1] == "main")
+    if not main_path or not _attach_existing(connection, archive_path(main_path)):
+        return False
+    _create_view(connection)
+    return True
+
+
+def create_rollups(cursor):
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS meter_monthly (
+        meter_id TEXT NOT NULL,
+        month TEXT NOT NULL,
+        readings INTEGER NOT NULL,
+        first_date TEXT NOT NULL,
+        first_value REAL NOT NULL,
+        last_date TEXT NOT NULL,
+        last_value REAL NOT NULL,
+        min_value REAL NOT NULL,
+        max_value REAL NOT NULL,
+        PRIMARY KEY (meter_id, month)
+    ) WITHOUT ROWID
+    ''')
+    rebuild_rollups(cursor)
+
+
+def rollup_rows(readings):
+    rollups = {}
+    for meter_id, reading_date, value in readings:
+        key = (meter_id, reading_date[:7])
+        rollup = rollups.get(key)
+        if rollup is None:
+            rollups[key] = [1, reading_date, value, reading_date, value, value, value]
+            continue
+        rollup[0] += 1
+        if reading_date < rollup[1]:
+            rollup[1], rollup[2] = reading_date, value
+        if reading_date >= rollup[3]:
+            rollup[3], rollup[4] = reading_date, value
+        rollup[5] = min(rollup[5], value)
+        rollup[6] = max(rollup[6], value)
+    return [key + tuple(rollup) for key, rollup in rollups.items()]
+
+
+def update_rollups(connection, readings):
+    connection.executemany(UPSERT_ROLLUP, rollup_rows(readings))
+
+
+def rebuild_rollups(cursor):
+    cursor.execute("DELETE FROM meter_monthly")
+    cursor.execute(f"INSERT INTO meter_monthly ({ROLLUP_COLUMNS}) {EXPECTED_ROLLUPS}")
+
+
+def check_rollups(connection):
+    return connection.execute(f'''
+    SELECT
+        (SELECT COUNT(*) FROM ({EXPECTED_ROLLUPS} EXCEPT SELECT {ROLLUP_COLUMNS} FROM meter_monthly)),
+        (SELECT COUNT(*) FROM (SELECT {ROLLUP_COLUMNS} FROM meter_monthly EXCEPT SELECT * FROM ({EXPECTED_ROLLUPS})))
+    ''').fetchone()
+
+
+def cutoff_date(years, today=None):
+    today = today or date.today()
+    return date(today.year - years, today.month, 1).isoformat()
+
+
+def _next_month(month_start):
+    year, month = int(month_start[:4]), int(month_start[5:7])
+    return date(year + 1, 1, 1).isoformat() if month == 12 else date(year, month + 1, 1).isoformat()
+
+
+def _ensure_archive(connection, db_path):
+    path = archive_path(db_path)
+    if not _is_attached(connection):
+        connection.execute(f"ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}", (path,))
+    with connection:
+        connection.execute(f'''
+        CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.meter_readings (
+            id INTEGER PRIMARY KEY,
+            meter_id TEXT NOT NULL,
+            date TEXT NOT NULL,
+            value REAL NOT NULL
+        )
+        ''')
+        connection.execute(f'''
+        CREATE INDEX IF NOT EXISTS {ARCHIVE_SCHEMA}.idx_archive_readings_meter_date
+        ON meter_readings (meter_id, date)
+        ''')
+    _create_view(connection)
+    return path
+
+
+def archive_readings(connection, db_path, years, vacuum=False, progress=None):
+    start = time.perf_counter()
+    cutoff = cutoff_date(years)
+    first = connection.execute(
+        "SELECT MIN(date) FROM main.meter_readings WHERE date < ?", (cutoff,)
+    ).fetchone()[0]
+    if first is None:
+        return ArchiveResult(cutoff, 0, 0, time.perf_counter() - start, None)
+
+    path = _ensure_archive(connection, db_path)
+    moved = 0
+    months = 0
+    month_start = first[:7] + "-01"
+    while month_start < cutoff:
+        month_end = _next_month(month_start)
+        with connection:
+            connection.execute(
+                f"""
+                INSERT OR IGNORE INTO {ARCHIVE_SCHEMA}.meter_readings (id, meter_id, date, value)
+                SELECT id, meter_id, date, value FROM main.meter_readings WHERE date >= ? AND date < ?
+                """,
+                (month_start, month_end)
+            )
+        with connection:
+            moved += connection.execute(
+                f"""
+                DELETE FROM main.meter_readings
+                WHERE date >= ? AND date < ?
+                  AND EXISTS (SELECT 1 FROM {ARCHIVE_SCHEMA}.meter_readings a WHERE a.id = main.meter_readings.id)
+                """,
+                (month_start, month_end)
+            ).rowcount
+        months += 1
+        if progress:
+            progress(month_start[:7], moved)
+        month_start = month_end
+
+    if vacuum:
+        connection.execute("VACUUM main")
+    return ArchiveResult(cutoff, moved, months, time.perf_counter() - start, path)
@@ -0,0 +1,199 @@
+import csv
+import json
+import math
+import os
+import time
+from datetime import date, datetime
+from functools import lru_cache
+
+import readings_archive
+
+BATCH_SIZE = 50_000
+PROGRESS_EVERY = 10_000
+REQUIRED_COLUMNS = ("meter_id", "date", "value")
+
+UPSERT_LATEST = """
+INSERT INTO meter_latest (meter_id, reading_id, date, value)
+SELECT meter_id, MAX(id), date, value
+FROM meter_readings
+WHERE id > ?
+GROUP BY meter_id
+ON CONFLICT (meter_id) DO UPDATE SET
+    reading_id = excluded.reading_id,
+    date = excluded.date,
+    value = excluded.value
+WHERE excluded.date >= meter_latest.date
+"""
+
+
+class ImportResult:
+    def __init__(self, total, imported, errors, elapsed, dry_run, cancelled):
+        self.total = total
+        self.imported = imported
+        self.errors = errors
+        self.elapsed = elapsed
+        self.dry_run = dry_run
+        self.cancelled = cancelled
+
+    @property
+    def rate(self):
+        return self.total / self.elapsed if self.elapsed > 0 else 0.0
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value):
+    value = value.strip()
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        return datetime.strptime(value, "%d.%m.%Y").date().isoformat()
+
+
+def iter_csv(path, required=REQUIRED_COLUMNS, optional=()):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        header_line = f.readline()
+        delimiter = ";" if header_line.count(";") > header_line.count(",") else ","
+        header = [name.strip().lower() for name in next(csv.reader([header_line], delimiter=delimiter))]
+        missing = [name for name in required if name not in header]
+        if missing:
+            raise ValueError(f"В файле нет столбцов: {', '.join(missing)}")
+
+        indexes = [header.index(name) for name in required]
+        indexes += [header.index(name) if name in header else None for name in optional]
+        empty = (None,) * len(indexes)
+        for line_no, row in enumerate(csv.reader(f, delimiter=delimiter), start=2):
+            if not row:
+                continue
+            try:
+                yield (line_no,) + tuple(None if index is None else row[index] for index in indexes)
+            except IndexError:
+                yield (line_no,) + empty
+
+
+def _iter_json_lines(path):
+    with open(path, encoding="utf-8-sig") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except ValueError:
+                yield line_no, None, None, None
+                continue
+            if not isinstance(item, dict):
+                yield line_no, None, None, None
+                continue
+            yield line_no, item.get("meter_id"), item.get("date"), item.get("value")
+
+
+def _iter_json(path):
+    with open(path, encoding="utf-8-sig") as f:
+        items = json.load(f)
+    if not isinstance(items, list):
+        raise ValueError("Ожидается JSON-массив показаний")
+    for line_no, item in enumerate(items, start=1):
+        if not isinstance(item, dict):
+            yield line_no, None, None, None
+            continue
+        yield line_no, item.get("meter_id"), item.get("date"), item.get("value")
+
+
+def iter_readings(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return _iter_json_lines(path)
+    if extension == ".json":
+        return _iter_json(path)
+    return iter_csv(path)
+
+
+def _flush(connection, batch):
+    last_id = connection.execute("SELECT COALESCE(MAX(id), 0) FROM meter_readings").fetchone()[0]
+    with connection:
+        connection.executemany(
+            "INSERT INTO meter_readings (meter_id, date, value) VALUES (?, ?, ?)",
+            batch
+        )
+        connection.execute(UPSERT_LATEST, (last_id,))
+        readings_archive.update_rollups(connection, batch)
+
+
+def import_readings(connection, path, dry_run=False, batch_size=BATCH_SIZE, progress=None, cancel_event=None):
+    start = time.perf_counter()
+    known_meters = {row[0] for row in connection.execute("SELECT id FROM meters")}
+    latest = {
+        meter_id: (reading_date, value)
+        for meter_id, reading_date, value in connection.execute("SELECT meter_id, date, value FROM meter_latest")
+    }
+
+    errors = []
+    batch = []
+    total = 0
+    imported = 0
+    cancelled = False
+
+    for line_no, meter_id, reading_date, value in iter_readings(path):
+        if cancel_event is not None and cancel_event.is_set():
+            cancelled = True
+            break
+        total += 1
+        if progress and total % PROGRESS_EVERY == 0:
+            progress(total)
+
+        if meter_id is None or reading_date is None or value is None:
+            errors.append((line_no, meter_id, "Неполная строка"))
+            continue
+
+        meter_id = str(meter_id).strip()
+        if meter_id not in known_meters:
+            errors.append((line_no, meter_id, "Неизвестный счетчик"))
+            continue
+
+        try:
+            reading_date = parse_date(str(reading_date))
+        except ValueError:
+            errors.append((line_no, meter_id, f"Некорректная дата: {reading_date}"))
+            continue
+
+        try:
+            value = float(str(value).replace(",", "."))
+        except ValueError:
+            errors.append((line_no, meter_id, f"Некорректное значение: {value}"))
+            continue
+        if not math.isfinite(value):
+            errors.append((line_no, meter_id, f"Некорректное значение: {value}"))
+            continue
+
+        previous = latest.get(meter_id)
+        if previous is not None:
+            if reading_date < previous[0]:
+                errors.append((line_no, meter_id, f"Дата раньше последнего показания ({previous[0]})"))
+                continue
+            if value < previous[1]:
+                errors.append((line_no, meter_id, f"Показание меньше предыдущего ({previous[1]})"))
+                continue
+
+        latest[meter_id] = (reading_date, value)
+        batch.append((meter_id, reading_date, value))
+
+        if len(batch) >= batch_size:
+            if not dry_run:
+                _flush(connection, batch)
+            imported += len(batch)
+            batch = []
+
+    if batch and not cancelled:
+        if not dry_run:
+            _flush(connection, batch)
+        imported += len(batch)
+
+    if progress:
+        progress(total)
+    return ImportResult(total, imported, errors, time.perf_counter() - start, dry_run, cancelled)
+
+
+def write_error_report(errors, path, key_column="meter_id"):
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(("line", key_column, "error"))
+        writer.writerows(errors)
@@ -0,0 +1,310 @@
+import os
+import time
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from functools import lru_cache
+
+from fontTools import subset
+from fpdf import FPDF
+from fpdf.enums import XPos, YPos
+
+import billing
+import db
+
+CHUNK_SIZE = 50
+MERGED_FILENAME = "Квитанции.pdf"
+ACCOUNT_COLUMNS = "id, address, owner, balance, subsidy, last_payment"
+
+
+class BatchResult:
+    def __init__(self, count, total, elapsed, cancelled, output_dir):
+        self.count = count
+        self.total = total
+        self.elapsed = elapsed
+        self.cancelled = cancelled
+        self.output_dir = output_dir
+
+    @property
+    def rate(self):
+        return self.count / self.elapsed if self.elapsed > 0 else 0.0
+
+
+FONT_DIR = os.path.dirname(os.path.abspath(__file__))
+FONT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "zhkh-fonts")
+FONT_CANDIDATES = (
+    ('DejaVu', {
+        '': 'DejaVuSansCondensed.ttf',
+        'B': 'DejaVuSansCondensed-Bold.ttf',
+        'I': 'DejaVuSansCondensed-Oblique.ttf',
+    }),
+    ('Arial', {
+        '': 'arial.ttf',
+        'B': 'arialbd.ttf',
+        'I': 'ariali.ttf',
+    }),
+)
+SUBSET_UNICODES = (
+    list(range(0x0020, 0x007F))
+    + list(range(0x00A0, 0x0100))
+    + list(range(0x0400, 0x0500))
+    + list(range(0x2010, 0x2070))
+    + [0x20BD, 0x2116]
+)
+
+
+def _font_path(filename):
+    path = os.path.join(FONT_DIR, filename)
+    return path if os.path.exists(path) else filename
+
+
+def _subset_font(path):
+    stat = os.stat(path)
+    name = os.path.splitext(os.path.basename(path))[0]
+    target = os.path.join(FONT_CACHE_DIR, f"{name}-{int(stat.st_mtime)}-{stat.st_size}.ttf")
+    if os.path.exists(target):
+        return target
+
+    options = subset.Options()
+    options.notdef_outline = True
+    options.name_IDs = ['*']
+    options.drop_tables += ['FFTM']
+
+    font = subset.load_font(path, options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=SUBSET_UNICODES)
+    subsetter.subset(font)
+
+    os.makedirs(FONT_CACHE_DIR, exist_ok=True)
+    temp_path = f"{target}.{os.getpid()}.tmp"
+    subset.save_font(font, temp_path, options)
+    os.replace(temp_path, target)
+    return target
+
+
+@lru_cache(maxsize=None)
+def resolve_font():
+    for family, files in FONT_CANDIDATES:
+        try:
+            return family, {style: _subset_font(_font_path(fname)) for style, fname in files.items()}
+        except Exception as e:
+            print(f"Ошибка при использовании {family}: {e}")
+    return None, {}
+
+
+def new_receipt_pdf():
+    pdf = FPDF()
+    family, files = resolve_font()
+    for style, path in files.items():
+        pdf.add_font(family, style, path)
+    return pdf, family
+
+
+def render_receipt(pdf, account, family, charges, period):
+    pdf.add_page()
+    if family:
+        pdf.set_font(family, '', 14)
+        _generate_russian_receipt(pdf, account, family, charges, period)
+    else:
+        pdf.set_font('helvetica', '', 14)
+        _generate_english_receipt(pdf, account, charges, period)
+
+
+def receipt_filename(account_id, family):
+    if family:
+        return f"Квитанция_{account_id}.pdf"
+    return f"Receipt_{account_id}.pdf"
+
+
+def build_receipt(account, charges, period):
+    pdf, family = new_receipt_pdf()
+    render_receipt(pdf, account, family, charges, period)
+    return pdf, family
+
+
+def _generate_russian_receipt(pdf, account, family, charges, period):
+    pdf.cell(0, 10, "Квитанция ЖКХ", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+    pdf.ln(10)
+
+    pdf.set_font(family, '', 12)
+    _add_pdf_row(pdf, "№ счета:", str(account[0]))
+    _add_pdf_row(pdf, "Адрес:", str(account[1]))
+    _add_pdf_row(pdf, "Владелец:", str(account[2]))
+    _add_pdf_row(pdf, "Период:", billing.format_period(period))
+    pdf.ln(10)
+
+    pdf.set_font(family, 'B', 12)
+    pdf.cell(0, 10, "Начисления:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(5)
+
+    pdf.set_font(family, '', 10)
+    col_widths = [80, 40, 40, 40]
+
+    headers = ["Услуга", "Тариф", "Объем", "Сумма"]
+    for i, header in enumerate(headers):
+        pdf.cell(col_widths[i], 10, header, border=1, align='C')
+    pdf.ln()
+
+    total = 0
+    subsidy = 0
+    for name_ru, name_en, rate, volume, amount, line_subsidy in charges:
+        total += amount
+        subsidy += line_subsidy
+
+        pdf.cell(col_widths[0], 10, name_ru, border=1)
+        pdf.cell(col_widths[1], 10, f"{rate:.2f} руб.", border=1, align='R')
+        pdf.cell(col_widths[2], 10, f"{volume:.1f}", border=1, align='R')
+        pdf.cell(col_widths[3], 10, f"{amount:.2f} руб.", border=1, align='R')
+        pdf.ln()
+
+    pdf.ln(5)
+    pdf.set_font(family, 'B', 12)
+    pdf.cell(0, 10, f"Итого к оплате: {total:.2f} руб.", align='R', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+    if subsidy:
+        pdf.cell(0, 10, f"С учетом субсидии {billing.SUBSIDY_RATE:.0%}:", align='R', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.cell(0, 10, f"К оплате: {total - subsidy:.2f} руб.", align='R', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+    pdf.ln(10)
+    pdf.set_font(family, 'I', 10)
+    pdf.cell(0, 10, f"Дата формирования: {datetime.now().strftime('%d.%m.%Y')}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+
+def _generate_english_receipt(pdf, account, charges, period):
+    pdf.cell(0, 10, "Housing Services Receipt", new_x=XPos.LMARGIN, new_y=YPos.NEXT, align='C')
+    pdf.ln(10)
+
+    pdf.set_font('helvetica', '', 12)
+    _add_pdf_row(pdf, "Account No:", str(account[0]))
+    _add_pdf_row(pdf, "Address:", str(account[1]))
+    _add_pdf_row(pdf, "Owner:", str(account[2]))
+    _add_pdf_row(pdf, "Period:", billing.format_period(period))
+    pdf.ln(10)
+
+    pdf.set_font('helvetica', 'B', 12)
+    pdf.cell(0, 10, "Charges:", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf.ln(5)
+
+    pdf.set_font('helvetica', '', 10)
+    col_widths = [80, 40, 40, 40]
+
+    headers = ["Service", "Rate", "Amount", "Total"]
+    for i, header in enumerate(headers):
+        pdf.cell(col_widths[i], 10, header, border=1, align='C')
+    pdf.ln()
+
+    total = 0
+    subsidy = 0
+    for name_ru, name_en, rate, volume, amount, line_subsidy in charges:
+        total += amount
+        subsidy += line_subsidy
+
+        pdf.cell(col_widths[0], 10, name_en, border=1)
+        pdf.cell(col_widths[1], 10, f"{rate:.2f} RUB", border=1, align='R')
+        pdf.cell(col_widths[2], 10, f"{volume:.1f}", border=1, align='R')
+        pdf.cell(col_widths[3], 10, f"{amount:.2f} RUB", border=1, align='R')
+        pdf.ln()
+
+    pdf.ln(5)
+    pdf.set_font('helvetica', 'B', 12)
+    pdf.cell(0, 10, f"Total amount: {total:.2f} RUB", align='R', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+    if subsidy:
+        pdf.cell(0, 10, f"With {billing.SUBSIDY_RATE:.0%} subsidy:", align='R', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        pdf.cell(0, 10, f"Amount due: {total - subsidy:.2f} RUB", align='R', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+    pdf.ln(10)
+    pdf.set_font('helvetica', 'I', 10)
+    pdf.cell(0, 10, f"Date: {datetime.now().strftime('%d.%m.%Y')}", new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+
+def _add_pdf_row(pdf, label, value):
+    pdf.cell(40, 10, label)
+    pdf.cell(0, 10, value, new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+
+
+def _load_accounts(connection, account_ids):
+    placeholders = ", ".join("?" for _ in account_ids)
+    return connection.execute(
+        f"SELECT {ACCOUNT_COLUMNS} FROM accounts WHERE id IN ({placeholders}) ORDER BY id",
+        list(account_ids)
+    ).fetchall()
+
+
+def _render_chunk(db_path, account_ids, output_dir, period):
+    connection = db.connect(db_path, readonly=True)
+    try:
+        accounts = _load_accounts(connection, account_ids)
+        charges = billing.load_charges_for_accounts(connection, account_ids, period)
+    finally:
+        connection.close()
+
+    for account in accounts:
+        pdf, family = build_receipt(account, charges.get(account[0], []), period)
+        pdf.output(os.path.join(output_dir, receipt_filename(account[0], family)))
+    return len(accounts)
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def generate_receipts_batch(db_path, account_ids, output_dir, period=None, merged=False, workers=None,
+                            chunk_size=CHUNK_SIZE, progress=None, cancel_event=None):
+    os.makedirs(output_dir, exist_ok=True)
+    period = period or billing.current_period()
+    account_ids = list(account_ids)
+    total = len(account_ids)
+    done = 0
+    cancelled = False
+    start = time.perf_counter()
+
+    connection = db.connect(db_path, readonly=True)
+    try:
+        billing.check_billed(connection, period, account_ids)
+    finally:
+        connection.close()
+
+    if merged:
+        pdf, family = new_receipt_pdf()
+        connection = db.connect(db_path, readonly=True)
+        try:
+            for chunk in _chunks(account_ids, chunk_size):
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    break
+                accounts = _load_accounts(connection, chunk)
+                charges = billing.load_charges_for_accounts(connection, chunk, period)
+                for account in accounts:
+                    render_receipt(pdf, account, family, charges.get(account[0], []), period)
+                done += len(accounts)
+                if progress:
+                    progress(done, total)
+        finally:
+            connection.close()
+        if not cancelled and done:
+            pdf.output(os.path.join(output_dir, MERGED_FILENAME))
+    else:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+            futures = [
+                executor.submit(_render_chunk, db_path, chunk, output_dir, period)
+                for chunk in _chunks(account_ids, chunk_size)
+            ]
+            for future in as_completed(futures):
+                if cancel_event is not None and cancel_event.is_set():
+                    cancelled = True
+                    for pending in futures:
+                        pending.cancel()
+                    break
+                done += future.result()
+                if progress:
+                    progress(done, total)
+            if cancelled:
+                done = sum(future.result() for future in futures if not future.cancelled())
+                if progress:
+                    progress(done, total)
+
+    return BatchResult(done, total, time.perf_counter() - start, cancelled, output_dir)
@@ -0,0 +1,196 @@
+from datetime import datetime
+
+import counters
+from billing import format_period
+from payments import KIND_PAYMENT, format_kopecks
+from storage import STATUS_CLOSED, STATUS_IN_PROGRESS, STATUS_OPEN, format_date
+
+
+def scalar(connection, query, params=()):
+    row = connection.execute(query, params).fetchone()
+    return row[0] if row else None
+
+
+def rows(connection, query, params=()):
+    return connection.execute(query, params).fetchall()
+
+
+def report_header(title):
+    return f"{title}\nДата формирования: {datetime.now().strftime('%d.%m.%Y %H:%M')}\n\n"
+
+
+def payments_report(connection):
+    account_count, subsidy_count = connection.execute(
+        "SELECT COUNT(*), COALESCE(SUM(subsidy != 0), 0) FROM accounts"
+    ).fetchone()
+    total_balance = scalar(connection, "SELECT COALESCE(SUM(amount), 0) FROM ledger_periods")
+
+    report = report_header("Отчет по платежам")
+    report += f"Всего лицевых счетов: {account_count}\n"
+    report += f"Субсидии предоставлены: {subsidy_count} счетам\n"
+    report += f"Общая сумма задолженности: {format_kopecks(total_balance)} руб.\n\n"
+
+    report += "Топ-5 должников:\n"
+    debtors = rows(
+        connection, "SELECT address, owner, balance_kopecks FROM accounts ORDER BY balance_kopecks DESC LIMIT 5"
+    )
+    for i, (address, owner, balance) in enumerate(debtors, 1):
+        report += f"{i}. {address} ({owner}): {format_kopecks(balance)} руб.\n"
+
+    by_period = rows(
+        connection,
+        "SELECT period, entries, -amount FROM ledger_periods WHERE kind = ? ORDER BY period DESC LIMIT 12",
+        (KIND_PAYMENT,)
+    )
+    if by_period:
+        report += "\nПоступления по месяцам:\n"
+        for period, entries, amount in by_period:
+            report += f"{format_period(period)}: {entries} платежей на {format_kopecks(amount)} руб.\n"
+
+    return report
+
+
+def requests_report(connection):
+    values = counters.load(connection)
+    by_status = dict(counters.grouped(values, counters.REQUESTS_STATUS))
+
+    report = report_header("Отчет по заявкам")
+    report += f"Всего заявок: {counters.get(values, counters.REQUESTS)}\n"
+    report += f"Открытые: {by_status.get(STATUS_OPEN, 0)}\n"
+    report += f"В работе: {by_status.get(STATUS_IN_PROGRESS, 0)}\n"
+    report += f"Закрытые: {by_status.get(STATUS_CLOSED, 0)}\n\n"
+
+    by_contractor = [
+        (name, counters.get(values, counters.REQUESTS_CONTRACTOR + name), open_jobs)
+        for name, open_jobs in rows(connection, "SELECT name, open_jobs FROM contractors ORDER BY id")
+    ]
+    if by_contractor:
+        report += "Заявки по подрядчикам:\n"
+        for name, count, open_jobs in by_contractor:
+            report += f"{name}: {count} заявок, не закрыто: {open_jobs}\n"
+
+    return report
+
+
+def meters_report(connection):
+    values = counters.load(connection)
+    by_type = counters.grouped(values, counters.METERS_TYPE)
+
+    report = report_header("Отчет по счетчикам")
+    report += f"Всего счетчиков: {counters.get(values, counters.METERS)}\n\n"
+
+    report += "Количество по типам:\n"
+    for meter_type, count in by_type:
+        report += f"{meter_type}: {count}\n"
+
+    return report
+
+
+def buildings_report(connection):
+    buildings = rows(
+        connection,
+        """
+        WITH account_totals AS (
+            SELECT ad.building_id, COUNT(*) AS accounts, SUM(a.balance_kopecks) AS balance
+            FROM accounts a
+            JOIN addresses ad ON ad.id = a.address_id
+            GROUP BY ad.building_id
+        ),
+        meter_totals AS (
+            SELECT ad.building_id, COUNT(*) AS meters
+            FROM meters m
+            JOIN addresses ad ON ad.id = m.address_id
+            GROUP BY ad.building_id
+        ),
+        request_totals AS (
+            SELECT ad.building_id, COUNT(*) AS requests, SUM(r.status != :closed) AS open_requests
+            FROM requests r
+            JOIN addresses ad ON ad.id = r.address_id
+            GROUP BY ad.building_id
+        )
+        SELECT
+            b.display,
+            COALESCE(a.accounts, 0),
+            COALESCE(a.balance, 0),
+            COALESCE(m.meters, 0),
+            COALESCE(r.requests, 0),
+            COALESCE(r.open_requests, 0)
+        FROM buildings b
+        LEFT JOIN account_totals a ON a.building_id = b.id
+        LEFT JOIN meter_totals m ON m.building_id = b.id
+        LEFT JOIN request_totals r ON r.building_id = b.id
+        ORDER BY COALESCE(a.balance, 0) DESC, b.key
+        """,
+        {"closed": STATUS_CLOSED}
+    )
+
+    report = report_header("Отчет по домам")
+    report += f"Всего домов: {len(buildings)}\n\n"
+    for display, accounts, balance, meters, requests, open_requests in buildings:
+        report += f"{display}\n"
+        report += f"  Лицевых счетов: {accounts}, задолженность: {format_kopecks(balance)} руб.\n"
+        report += f"  Счетчиков: {meters}\n"
+        report += f"  Заявок: {requests}, из них не закрыто: {open_requests}\n"
+
+    return report
+
+
+def anomalies_report(connection):
+    import consumption
+
+    analysis = consumption.analyze(connection)
+    anomalies = analysis.anomalies
+
+    report = report_header("Аномалии потребления")
+    report += f"Проанализировано показаний: {analysis.reading_count} по {analysis.meter_count} счетчикам "
+    report += f"за {analysis.elapsed:.2f} с\n"
+    report += (
+        f"Критерии: откат показаний, нет расхода {consumption.ZERO_PERIODS} периода подряд, "
+        f"скачок более {consumption.SPIKE_SIGMA:g}σ от истории счетчика\n\n"
+    )
+
+    by_kind = {kind: 0 for kind in consumption.KIND_TITLES}
+    for anomaly in anomalies:
+        by_kind[anomaly.kind] += 1
+    for kind, title in consumption.KIND_TITLES.items():
+        report += f"{title}: {by_kind[kind]}\n"
+
+    if not anomalies:
+        return report + "\nАномалий не обнаружено\n"
+
+    shown = anomalies[:consumption.REPORT_LIMIT]
+    meter_ids = sorted({anomaly.meter_id for anomaly in shown})
+    placeholders = ", ".join("?" for _ in meter_ids)
+    meters = {
+        meter_id: (meter_type, address)
+        for meter_id, meter_type, address in rows(
+            connection, f"SELECT id, type, address FROM meters WHERE id IN ({placeholders})", meter_ids
+        )
+    }
+
+    report += f"\nТоп-{len(shown)} аномалий:\n"
+    for i, anomaly in enumerate(shown, 1):
+        meter_type, address = meters.get(anomaly.meter_id, ("-", "-"))
+        if anomaly.kind == consumption.ZERO_USAGE:
+            details = f"{anomaly.value} периодов подряд с {format_date(anomaly.date)}"
+        elif anomaly.kind == consumption.SPIKE:
+            details = f"{anomaly.value:.2f} ({anomaly.score:.1f}σ) на {format_date(anomaly.date)}"
+        else:
+            details = f"{anomaly.value:.2f} на {format_date(anomaly.date)}"
+        title = consumption.KIND_TITLES[anomaly.kind]
+        report += f"{i}. {anomaly.meter_id} ({meter_type}, {address}): {title}: {details}\n"
+
+    return report
+
+
+REPORTS = {
+    "payments": ("Отчет по платежам", payments_report),
+    "requests": ("Отчет по заявкам", requests_report),
+    "meters": ("Отчет по счетчикам", meters_report),
+    "buildings": ("Отчет по домам", buildings_report),
+    "anomalies": ("Аномалии потребления", anomalies_report),
+}
+
+
+def build_report(connection, name):
+    return REPORTS[name][1](connection)
@@ -0,0 +1,261 @@
+import addresses
+import billing
+import changes
+import counters
+import dispatch
+import payments
+import readings_archive
+import search
+
+SCHEMA_VERSION = 16
+
+
+def iso_from_legacy_sql(column):
+    return (
+        f"substr({column}, 7, 4) || '-' || substr({column}, 4, 2) || '-' || substr({column}, 1, 2)"
+    )
+
+
+def create_tables(connection):
+    cursor = connection.cursor()
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS accounts (
+        id TEXT PRIMARY KEY,
+        address TEXT NOT NULL,
+        owner TEXT NOT NULL,
+        balance REAL DEFAULT 0,
+        subsidy BOOLEAN DEFAULT FALSE,
+        last_payment TEXT
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS requests (
+        id TEXT PRIMARY KEY,
+        account_id TEXT,
+        date TEXT NOT NULL,
+        address TEXT NOT NULL,
+        problem TEXT NOT NULL,
+        contact TEXT,
+        status TEXT NOT NULL,
+        contractor TEXT,
+        FOREIGN KEY (account_id) REFERENCES accounts(id)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS meters (
+        id TEXT PRIMARY KEY,
+        type TEXT NOT NULL,
+        address TEXT NOT NULL
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS meter_readings (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        meter_id TEXT NOT NULL,
+        date TEXT NOT NULL,
+        value REAL NOT NULL,
+        FOREIGN KEY (meter_id) REFERENCES meters(id)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_meter_readings_meter_date
+    ON meter_readings (meter_id, date)
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS meter_latest (
+        meter_id TEXT PRIMARY KEY,
+        reading_id INTEGER NOT NULL,
+        date TEXT NOT NULL,
+        value REAL NOT NULL,
+        FOREIGN KEY (meter_id) REFERENCES meters(id)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS contractors (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        specialty TEXT,
+        contact TEXT
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS sequences (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS services (
+        code TEXT PRIMARY KEY,
+        sort_order INTEGER NOT NULL,
+        name_ru TEXT NOT NULL,
+        name_en TEXT NOT NULL,
+        meter_type TEXT,
+        norm_volume REAL NOT NULL DEFAULT 0
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS tariffs (
+        service TEXT NOT NULL,
+        valid_from TEXT NOT NULL,
+        rate REAL NOT NULL,
+        PRIMARY KEY (service, valid_from),
+        FOREIGN KEY (service) REFERENCES services(code)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS charges (
+        account_id TEXT NOT NULL,
+        period TEXT NOT NULL,
+        service TEXT NOT NULL,
+        rate REAL NOT NULL,
+        volume REAL NOT NULL,
+        amount REAL NOT NULL,
+        subsidy REAL NOT NULL DEFAULT 0,
+        PRIMARY KEY (account_id, period, service),
+        FOREIGN KEY (account_id) REFERENCES accounts(id),
+        FOREIGN KEY (service) REFERENCES services(code)
+    )
+    ''')
+
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_charges_period ON charges (period)
+    ''')
+
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_requests_status ON requests (status)
+    ''')
+
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_requests_contractor ON requests (contractor)
+    ''')
+
+    connection.commit()
+    migrate_schema(connection)
+
+
+def migrate_schema(connection):
+    version = connection.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return
+
+    with connection:
+        cursor = connection.cursor()
+
+        if version < 1:
+            cursor.execute('''
+            INSERT OR IGNORE INTO meter_latest (meter_id, reading_id, date, value)
+            SELECT r.meter_id, r.id, r.date, r.value
+            FROM meter_readings r
+            JOIN (
+                SELECT meter_id, MAX(id) AS id
+                FROM meter_readings
+                GROUP BY meter_id
+            ) latest ON latest.id = r.id
+            ''')
+
+            legacy_date = "GLOB '[0-9][0-9].[0-9][0-9].[0-9][0-9][0-9][0-9]'"
+            for table, column in (
+                ("requests", "date"),
+                ("meter_readings", "date"),
+                ("meter_latest", "date"),
+                ("accounts", "last_payment"),
+            ):
+                cursor.execute(
+                    f"UPDATE {table} SET {column} = {iso_from_legacy_sql(column)} "
+                    f"WHERE {column} {legacy_date}"
+                )
+            cursor.execute("UPDATE accounts SET last_payment = NULL WHERE last_payment = '-'")
+
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_requests_date ON requests (date)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_meter_readings_date ON meter_readings (date)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_accounts_last_payment ON accounts (last_payment)")
+
+        if version < 2:
+            billing.seed_tariffs(cursor)
+
+        if version < 3:
+            cursor.execute('''
+            INSERT OR IGNORE INTO sequences (name, value)
+            SELECT 'requests', COALESCE(MAX(CAST(substr(id, 5) AS INTEGER)), 0)
+            FROM requests
+            WHERE id GLOB 'REQ-[0-9]*'
+            ''')
+
+        if version < 4:
+            search.create_indexes(cursor)
+
+        if version < 5:
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS buildings (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                display TEXT NOT NULL
+            )
+            ''')
+            cursor.execute('''
+            CREATE TABLE IF NOT EXISTS addresses (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                building_id INTEGER NOT NULL,
+                apartment TEXT NOT NULL DEFAULT '',
+                display TEXT NOT NULL,
+                FOREIGN KEY (building_id) REFERENCES buildings(id)
+            )
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_addresses_building ON addresses (building_id)")
+
+            for table in addresses.LINKED_TABLES:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN address_id INTEGER REFERENCES addresses(id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_accounts_address ON accounts (address_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_meters_address_id_type ON meters (address_id, type)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_requests_address ON requests (address_id, status)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_requests_account ON requests (account_id)")
+
+            addresses.link_addresses(cursor)
+
+        if version < 6:
+            payments.create_ledger(cursor)
+
+        if version < 7:
+            counters.create_counters(cursor)
+
+        if version < 8:
+            readings_archive.create_rollups(cursor)
+
+        if version < 9:
+            changes.create_change_log(cursor)
+
+        if version < 10:
+            dispatch.create_workload(cursor)
+
+        if version < 11:
+            billing.create_accruals(cursor)
+
+        if version < 12:
+            addresses.relink_addresses(cursor)
+
+        if version < 13:
+            cursor.execute("DROP TRIGGER IF EXISTS meter_monthly_insert")
+
+        if version < 14:
+            addresses.relink_addresses(cursor)
+
+        if version < 15:
+            cursor.execute("DROP INDEX IF EXISTS idx_accounts_balance")
+
+        if version < 16:
+            cursor.execute("DROP INDEX IF EXISTS idx_meters_address_type")
+
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
@@ -0,0 +1,65 @@
+import re
+
+TOKENIZER = "unicode61 remove_diacritics 2"
+PREFIX_LENGTHS = "2 3"
+
+SEARCH_INDEXES = {
+    "requests": ("requests_fts", ("problem", "address")),
+    "accounts": ("accounts_fts", ("address", "owner")),
+}
+
+
+def fold(text):
+    return text.replace("ё", "е").replace("Ё", "Е")
+
+
+def fold_sql(expression):
+    return f"replace(replace({expression}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+def match_expression(text):
+    return " ".join(f'"{word}"*' for word in re.findall(r"\w+", fold(text)))
+
+
+def search_condition(table):
+    index = SEARCH_INDEXES[table][0]
+    return f"{table}.rowid IN (SELECT rowid FROM {index} WHERE {index} MATCH ?)"
+
+
+def create_indexes(cursor):
+    for table, (index, columns) in SEARCH_INDEXES.items():
+        column_list = ", ".join(columns)
+        new_values = ", ".join(fold_sql(f"new.{column}") for column in columns)
+        assignments = ", ".join(f"{column} = {fold_sql(f'new.{column}')}" for column in columns)
+
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5("
+            f"{column_list}, tokenize = '{TOKENIZER}', prefix = '{PREFIX_LENGTHS}')"
+        )
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {index}_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {index} (rowid, {column_list}) VALUES (new.rowid, {new_values});
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {index}_delete AFTER DELETE ON {table} BEGIN
+            DELETE FROM {index} WHERE rowid = old.rowid;
+        END
+        ''')
+        cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS {index}_update AFTER UPDATE OF {column_list} ON {table} BEGIN
+            UPDATE {index} SET {assignments} WHERE rowid = new.rowid;
+        END
+        ''')
+    rebuild_indexes(cursor)
+
+
+def rebuild_indexes(cursor):
+    for table, (index, columns) in SEARCH_INDEXES.items():
+        column_list = ", ".join(columns)
+        cursor.execute(f"DELETE FROM {index}")
+        cursor.execute(
+            f"INSERT INTO {index} (rowid, {column_list}) "
+            f"SELECT rowid, {', '.join(fold_sql(column) for column in columns)} FROM {table}"
+        )
+        cursor.execute(f"INSERT INTO {index} ({index}) VALUES ('optimize')")
@@ -0,0 +1,134 @@
+from datetime import date
+
+import addresses
+import payments
+import readings_archive
+from db import transaction
+
+DISPLAY_DATE_FORMAT = "%d.%m.%Y"
+REQUEST_ID_FORMAT = "REQ-{:04d}"
+
+STATUS_OPEN = "Открыта"
+STATUS_IN_PROGRESS = "В работе"
+STATUS_CLOSED = "Закрыта"
+
+
+def today_iso():
+    return date.today().isoformat()
+
+
+def format_date(value):
+    if not value:
+        return "-"
+    try:
+        return date.fromisoformat(value).strftime(DISPLAY_DATE_FORMAT)
+    except ValueError:
+        return value
+
+
+def next_sequence_value(connection, name):
+    connection.execute("UPDATE sequences SET value = value + 1 WHERE name = ?", (name,))
+    return connection.execute("SELECT value FROM sequences WHERE name = ?", (name,)).fetchone()[0]
+
+
+def allocate_request_id(connection):
+    return REQUEST_ID_FORMAT.format(next_sequence_value(connection, "requests"))
+
+
+def add_account(connection, account_id, address, owner, balance, subsidy):
+    with transaction(connection):
+        address_id = addresses.resolve(connection, address)
+        connection.execute(
+            "INSERT INTO accounts (id, address, owner, subsidy, address_id) VALUES (?, ?, ?, ?, ?)",
+            (account_id, address, owner, subsidy, address_id)
+        )
+        opening = payments.to_kopecks(balance)
+        if opening:
+            payments.post_entry(connection, account_id, today_iso(), payments.KIND_OPENING, opening)
+
+
+def post_payment(connection, account_id, amount, payment_date=None, document=None):
+    with transaction(connection):
+        if connection.execute("SELECT 1 FROM accounts WHERE id = ?", (account_id,)).fetchone() is None:
+            raise ValueError(f"Неизвестный лицевой счет: {account_id}")
+        return payments.post_entry(
+            connection,
+            account_id,
+            payment_date or today_iso(),
+            payments.KIND_PAYMENT,
+            -payments.to_kopecks(amount),
+            document
+        )
+
+
+def delete_account(connection, account_id):
+    with transaction(connection):
+        connection.execute("DELETE FROM accounts WHERE id = ?", (account_id,))
+
+
+def add_request(connection, address, problem, contact):
+    with transaction(connection):
+        request_id = allocate_request_id(connection)
+        address_id = addresses.resolve(connection, address)
+        account_id = addresses.account_for_address(connection, address_id)
+        connection.execute(
+            "INSERT INTO requests (id, account_id, date, address, problem, contact, status, contractor, address_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (request_id, account_id, today_iso(), address, problem, contact, STATUS_OPEN, None, address_id)
+        )
+    return request_id
+
+
+def close_request(connection, request_id):
+    with transaction(connection):
+        cursor = connection.execute(
+            "UPDATE requests SET status = ? WHERE id = ? AND status != ?",
+            (STATUS_CLOSED, request_id, STATUS_CLOSED)
+        )
+    return cursor.rowcount > 0
+
+
+def assign_contractor(connection, request_id, contractor):
+    with transaction(connection):
+        connection.execute(
+            "UPDATE requests SET contractor = ?, contractor_id = (SELECT MIN(id) FROM contractors WHERE name = ?), "
+            "status = ? WHERE id = ?",
+            (contractor, contractor, STATUS_IN_PROGRESS, request_id)
+        )
+
+
+def contractor_names(connection):
+    return [row[0] for row in connection.execute("SELECT name FROM contractors ORDER BY id")]
+
+
+def get_meter(connection, meter_id):
+    return connection.execute("SELECT id, type, address FROM meters WHERE id = ?", (meter_id,)).fetchone()
+
+
+def save_meter_reading(connection, meter_id, reading_date, value):
+    with transaction(connection):
+        reading_id = connection.execute(
+            "INSERT INTO meter_readings (meter_id, date, value) VALUES (?, ?, ?)",
+            (meter_id, reading_date, value)
+        ).lastrowid
+        connection.execute(
+            """
+            INSERT INTO meter_latest (meter_id, reading_id, date, value) VALUES (?, ?, ?, ?)
+            ON CONFLICT (meter_id) DO UPDATE SET
+                reading_id = excluded.reading_id,
+                date = excluded.date,
+                value = excluded.value
+            """,
+            (meter_id, reading_id, reading_date, value)
+        )
+        readings_archive.update_rollups(connection, [(meter_id, reading_date, value)])
+    return reading_id
+
+
+def add_meter(connection, meter_id, meter_type, address, initial_value):
+    with transaction(connection):
+        connection.execute(
+            "INSERT INTO meters (id, type, address, address_id) VALUES (?, ?, ?, ?)",
+            (meter_id, meter_type, address, addresses.resolve(connection, address))
+        )
+        save_meter_reading(connection, meter_id, today_iso(), initial_value)
@@ -0,0 +1,223 @@
+import os
+import random
+import time
+from datetime import date, timedelta
+
+import addresses
+import billing
+import changes
+import db
+import payments
+import readings_archive
+import schema
+import storage
+from readings_import import UPSERT_LATEST
+
+BATCH_SIZE = 50_000
+
+STREETS = (
+    "Ленина", "Мира", "Садовая", "Советская", "Школьная", "Лесная", "Набережная", "Молодежная",
+    "Центральная", "Новая", "Заречная", "Полевая", "Гагарина", "Пушкина", "Королёва", "Николинские ключи",
+)
+LAST_NAMES = ("Иванов", "Петров", "Сидоров", "Кузнецов", "Смирнов", "Попов", "Соколов", "Лебедев", "Козлов", "Новиков")
+FIRST_NAMES = ("Александр", "Сергей", "Дмитрий", "Андрей", "Алексей", "Мария", "Елена", "Ольга", "Наталья", "Артём")
+CONTRACTOR_SPECIALTIES = ("Сантехника", "Электрика", "Лифты", "Кровля", "Газовое оборудование", "Отопление")
+PROBLEMS = (
+    "Протечка в ванной", "Не работает лифт", "Нет горячей воды", "Засор канализации", "Не горит свет в подъезде",
+    "Протекает крыша", "Холодные батареи", "Запах газа на лестнице", "Сломан домофон", "Искрит розетка",
+    "Течет кран на кухне", "Шумит стояк отопления", "Прорвало водопровод в подвале", "Забит водосток",
+    "Оголенный провод в подъезде", "Не зажигается газовая колонка",
+)
+METER_TYPES = {
+    "Холодная вода": 5.0,
+    "Горячая вода": 3.5,
+    "Электричество": 150.0,
+    "Газ": 12.0,
+    "Отопление": 1.2,
+}
+STATUSES = ((storage.STATUS_OPEN, 0.2), (storage.STATUS_IN_PROGRESS, 0.2), (storage.STATUS_CLOSED, 0.6))
+
+
+class GenerateResult:
+    def __init__(self, path, counts, elapsed):
+        self.path = path
+        self.counts = counts
+        self.elapsed = elapsed
+
+
+def _person(rng):
+    return f"{rng.choice(LAST_NAMES)} {rng.choice(FIRST_NAMES)}"
+
+
+def _insert_batches(connection, query, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            with connection:
+                connection.executemany(query, batch)
+            batch = []
+    if batch:
+        with connection:
+            connection.executemany(query, batch)
+
+
+def _past_periods(today, count):
+    year, month = today.year, today.month
+    periods = []
+    for _ in range(count):
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+        periods.append(f"{year}-{month:02d}")
+    return periods[::-1]
+
+
+def generate(path, accounts=1000, meters=2000, readings=24, requests=5000, contractors=10, payments_per_account=6,
+             apartments=60, seed=1, force=False, progress=None):
+    if accounts < 1:
+        raise ValueError("Нужен хотя бы один лицевой счет")
+    if os.path.exists(path):
+        if not force:
+            raise ValueError(f"Файл {path} уже существует")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    start = time.perf_counter()
+    rng = random.Random(seed)
+    today = date.today()
+    connection = db.connect(path)
+    try:
+        schema.create_tables(connection)
+
+        def report(stage):
+            if progress:
+                progress(stage)
+
+        report("Подрядчики")
+        with connection:
+            connection.executemany(
+                "INSERT INTO contractors (name, specialty, contact) VALUES (?, ?, ?)",
+                [
+                    (f"{_person(rng)} ({CONTRACTOR_SPECIALTIES[i % len(CONTRACTOR_SPECIALTIES)]})",
+                     CONTRACTOR_SPECIALTIES[i % len(CONTRACTOR_SPECIALTIES)],
+                     f"+7 900 {rng.randrange(10**7):07d}")
+                    for i in range(contractors)
+                ]
+            )
+        contractor_rows = connection.execute("SELECT id, name FROM contractors ORDER BY id").fetchall()
+
+        report("Лицевые счета")
+        address_ids = {}
+        account_rows = []
+        with connection:
+            for i in range(accounts):
+                building = i // apartments
+                address = f"ул. {STREETS[building % len(STREETS)]}, д. {building // len(STREETS) + 1}, кв. {i % apartments + 1}"
+                address_ids[address] = addresses.resolve(connection, address)
+                account_rows.append((f"{i + 1:08d}", address, _person(rng), rng.random() < 0.1, address_ids[address]))
+        _insert_batches(
+            connection,
+            "INSERT INTO accounts (id, address, owner, subsidy, address_id) VALUES (?, ?, ?, ?, ?)",
+            account_rows
+        )
+
+        report("Платежи")
+        ledger_query = """
+            INSERT INTO ledger (account_id, date, period, kind, amount, document, source)
+            VALUES (?, ?, substr(?, 1, 7), ?, ?, ?, 'synthetic')
+        """
+
+        def ledger_rows():
+            document = 0
+            for account_id, *_ in account_rows:
+                opening = rng.randrange(0, 2_000_000)
+                opening_date = (today - timedelta(days=31 * (payments_per_account + 1))).isoformat()
+                yield account_id, opening_date, opening_date, payments.KIND_OPENING, opening, None
+                for month in range(payments_per_account, 0, -1):
+                    document += 1
+                    paid = (today - timedelta(days=31 * month - rng.randrange(28))).isoformat()
+                    yield account_id, paid, paid, payments.KIND_PAYMENT, -rng.randrange(150_000, 350_000), f"SYN{document}"
+
+        _insert_batches(connection, ledger_query, ledger_rows())
+
+        report("Счетчики")
+        meter_rows = []
+        for i in range(meters):
+            _, address, _, _, address_id = account_rows[i % len(account_rows)]
+            meter_type = rng.choice(list(METER_TYPES))
+            meter_rows.append((f"M{i + 1:08d}", meter_type, address, address_id))
+        _insert_batches(connection, "INSERT INTO meters (id, type, address, address_id) VALUES (?, ?, ?, ?)", meter_rows)
+
+        report("Показания")
+
+        def reading_rows():
+            first = today - timedelta(days=30 * readings)
+            for meter_id, meter_type, _, _ in meter_rows:
+                value = round(rng.uniform(0, 1000), 2)
+                usage = METER_TYPES[meter_type]
+                for k in range(readings):
+                    value = round(value + max(rng.gauss(usage, usage * 0.2), 0), 2)
+                    yield meter_id, (first + timedelta(days=30 * k)).isoformat(), value
+
+        _insert_batches(connection, "INSERT INTO meter_readings (meter_id, date, value) VALUES (?, ?, ?)", reading_rows())
+        with connection:
+            connection.execute(UPSERT_LATEST, (0,))
+            readings_archive.rebuild_rollups(connection)
+
+        report("Начисления")
+        for period in _past_periods(today, payments_per_account):
+            billing.run_billing(connection, period)
+
+        report("Заявки")
+
+        def request_rows():
+            for i in range(requests):
+                _, address, _, _, address_id = rng.choice(account_rows)
+                status = rng.choices([s for s, _ in STATUSES], [w for _, w in STATUSES])[0]
+                contractor_id, contractor = (
+                    rng.choice(contractor_rows) if contractor_rows and status != storage.STATUS_OPEN else (None, None)
+                )
+                yield (
+                    storage.REQUEST_ID_FORMAT.format(i + 1),
+                    None,
+                    (today - timedelta(days=rng.randrange(730))).isoformat(),
+                    address,
+                    rng.choice(PROBLEMS),
+                    _person(rng),
+                    status,
+                    contractor,
+                    contractor_id,
+                    address_id,
+                )
+
+        _insert_batches(
+            connection,
+            "INSERT INTO requests (id, account_id, date, address, problem, contact, status, contractor, contractor_id, "
+            "address_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            request_rows()
+        )
+        with connection:
+            connection.execute('''
+            UPDATE requests SET account_id = (
+                SELECT MIN(a.id) FROM accounts a WHERE a.address_id = requests.address_id
+            )
+            ''')
+            connection.execute(
+                "INSERT INTO sequences (name, value) VALUES ('requests', ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = excluded.value",
+                (requests,)
+            )
+            connection.execute("INSERT INTO requests_fts (requests_fts) VALUES ('optimize')")
+            connection.execute("INSERT INTO accounts_fts (accounts_fts) VALUES ('optimize')")
+
+        changes.prune(connection, keep=0)
+        report("Статистика")
+        connection.execute("ANALYZE")
+        counts = {
+            table: connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("accounts", "meters", "meter_readings", "requests", "contractors", "ledger")
+        }
+    finally:
+        connection.close()
+
+    return GenerateResult(path, counts, time.perf_counter() - start)